@@ -0,0 +1,284 @@
+"""Plays many agent games at once on asyncio.
+
+Each game is a `main.py` subprocess driven through asyncio pipes, so nothing
+blocks while a game or the model is busy. All games share one AsyncOpenAI
+client, and with it one HTTP connection pool, and `concurrency` bounds how
+many games run at the same time. With --batch, model calls that arrive within
+a short window go out as one /v1/completions request with a list of prompts.
+This needs a server that accepts batched prompts. If the server rejects it,
+the runner falls back to one chat request per game. --transcript logs every
+step of every game to one rotating JSON-lines file (see transcript.py).
+
+    python agent_runner.py --games 500 --concurrency 32 --batch --transcript runs/fleet.jsonl
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List, Optional, Set
+
+from openai import AsyncOpenAI
+
+from decision_cache import DecisionCache
+from observation import ObservationCompactor
+from small_llm_play_game import AIPlayer, GAME_COMMAND, game_argv, PROMPT_MARKERS, SERVER_URL, SYSTEM_PROMPT, TOKEN_BUDGET
+from transcript import CONSOLE_MODES, Transcript
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+FALLBACK_DECISION = {"thought": "I seem to be confused.", "action": "rest"}
+
+
+class AsyncGameRunner:
+    """asyncio counterpart of GameRunner; reads the game's output in chunks."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+
+    @classmethod
+    async def start(cls, command: str = GAME_COMMAND) -> "AsyncGameRunner":
+        process = await asyncio.create_subprocess_exec(
+            *game_argv(command), cwd=GAME_DIR,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        return cls(process)
+
+    async def read_output(self) -> str:
+        """Reads until the last line on screen is a prompt, or the game exits."""
+        chunks: List[bytes] = []
+        while True:
+            data = await self.process.stdout.read(65536)
+            if not data:
+                break
+            chunks.append(data)
+            # The prompt may straddle two reads, so look at the last two chunks.
+            tail = b"".join(chunks[-2:]).decode(errors="replace").rsplit("\n", 1)[-1]
+            if tail.strip().endswith(PROMPT_MARKERS):
+                break
+        return b"".join(chunks).decode(errors="replace")
+
+    async def send_input(self, action: str):
+        self.process.stdin.write((action + "\n").encode())
+        await self.process.stdin.drain()
+
+    def is_running(self) -> bool:
+        return self.process.returncode is None
+
+    async def close(self):
+        if self.is_running():
+            self.process.kill()
+        await self.process.wait()
+
+
+def render_prompt(messages: list) -> str:
+    """Flattens a chat history into one completion prompt for batched requests."""
+    lines = [f"{m['role'].capitalize()}: {m['content'].strip()}" for m in messages]
+    return "\n\n".join(lines) + "\n\nAssistant:"
+
+
+class AsyncAIPlayer:
+    """Async model client shared by every game, with optional request batching."""
+
+    def __init__(self, client: AsyncOpenAI, model: str = "local-model", batch: bool = False,
+                 max_batch: int = 32, window: float = 0.01, cache: Optional[DecisionCache] = None):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.batch = batch
+        self.max_batch = max_batch
+        self.window = window
+        self.requests = 0
+        self.batches = 0
+        self._pending = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only holds tasks weakly; an unreferenced batch in flight
+        # could be collected and leave its games waiting forever.
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get_action(self, history: list, screen: Optional[str] = None,
+                         previous: Optional[str] = None) -> dict:
+        """`screen` is the raw game screen behind the last message; decisions are cached on it.
+        `previous` is the screen the last action answered: if it has the same key, that action
+        did nothing, so the cached decision is dropped and the model is asked again."""
+        if self.cache is None or screen is None:
+            return await self._decide(history)
+        key = self.cache.key(screen)
+        if previous is not None and self.cache.key(previous) == key:
+            self.cache.evict(key)
+        decision = self.cache.get(key)
+        if decision is None:
+            decision = await self._decide(history)
+            if decision != FALLBACK_DECISION:
+                self.cache.put(key, decision)
+        return decision
+
+    async def _decide(self, history: list) -> dict:
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}] + history
+        if not self.batch:
+            return await self._chat(messages)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((messages, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    async def _chat(self, messages: list) -> dict:
+        self.requests += 1
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model, messages=messages, temperature=0.7, max_tokens=100)
+            return AIPlayer.parse_response(response.choices[0].message.content)
+        except Exception as e:
+            print(f"--- AI ERROR: {e} ---")
+            return dict(FALLBACK_DECISION)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch: list):
+        try:
+            self.requests += 1
+            response = await self.client.completions.create(
+                model=self.model, prompt=[render_prompt(m) for m, _ in batch],
+                temperature=0.7, max_tokens=100)
+            self.batches += 1
+            # Check the whole response before resolving anything, so a bad one
+            # leaves every future to the fallback below.
+            texts = [None] * len(batch)
+            for choice in response.choices:
+                if not 0 <= choice.index < len(batch):
+                    raise ValueError(f"completion index {choice.index} out of range")
+                texts[choice.index] = choice.text
+            if None in texts:
+                raise ValueError(f"{texts.count(None)} of {len(batch)} completions missing")
+            for (_, future), text in zip(batch, texts):
+                if not future.done():
+                    future.set_result(AIPlayer.parse_response(text))
+        except Exception as e:
+            print(f"--- Batched completions unavailable ({e}); falling back to chat requests ---")
+            self.batch = False
+            batch = [(m, future) for m, future in batch if not future.done()]
+            results = await asyncio.gather(*(self._chat(m) for m, _ in batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+async def play_game(game_id: int, ai: AsyncAIPlayer, command: str, max_turns: int,
+                    delay: float = 0.0, compact: bool = False, transcript: Optional[Transcript] = None) -> dict:
+    game = await AsyncGameRunner.start(command)
+    compactor = ObservationCompactor() if compact else None
+    history = []
+    turns = 0
+    screen = ""
+    try:
+        while game.is_running() and turns < max_turns:
+            state = await game.read_output()
+            if not state:
+                break
+            if compactor:
+                history.append({"role": "user", "content": compactor.compact(state)})
+                history = compactor.trim(history, TOKEN_BUDGET)
+            else:
+                history.append({"role": "user", "content": state})
+                history = history[-10:]
+
+            start = time.perf_counter()
+            decision = await ai.get_action(history, state, screen or None)
+            screen = state
+            if transcript is not None:
+                transcript.step(state, decision["thought"], decision["action"], time.perf_counter() - start,
+                                game=game_id)
+            history.append({"role": "assistant", "content": f"Thought: {decision['thought']}\n{decision['action']}"})
+            await game.send_input(decision["action"])
+            turns += 1
+            if delay:
+                await asyncio.sleep(delay)
+        # Give a game that just exited a moment to report its return code.
+        await asyncio.sleep(0)
+        saved = compactor.tokens_saved if compactor else 0
+        return {"game": game_id, "turns": turns, "exited": not game.is_running(),
+                "last_screen": screen[-300:], "tokens_saved": saved}
+    except (BrokenPipeError, ConnectionResetError):
+        return {"game": game_id, "turns": turns, "exited": True, "last_screen": screen[-300:],
+                "tokens_saved": compactor.tokens_saved if compactor else 0}
+    finally:
+        await game.close()
+
+
+async def run_games(games: int, concurrency: int = 16, command: str = GAME_COMMAND,
+                    base_url: str = SERVER_URL, batch: bool = False, max_turns: int = 100,
+                    delay: float = 0.0, cache: Optional[DecisionCache] = None, compact: bool = False,
+                    transcript: Optional[Transcript] = None) -> dict:
+    client = AsyncOpenAI(base_url=base_url, api_key="lm-studio")
+    ai = AsyncAIPlayer(client, batch=batch, max_batch=concurrency, cache=cache)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def bounded(game_id: int) -> dict:
+        async with limit:
+            return await play_game(game_id, ai, command, max_turns, delay, compact, transcript)
+
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(bounded(i) for i in range(games)))
+    finally:
+        await client.close()
+    return {
+        "games": results,
+        "elapsed": time.perf_counter() - start,
+        "model_requests": ai.requests,
+        "batched_requests": ai.batches
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many agent games concurrently.")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--batch", action="store_true", help="combine concurrent model calls into batched completions")
+    parser.add_argument("--server", default=SERVER_URL)
+    parser.add_argument("--command", default=GAME_COMMAND)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to pause after each action")
+    parser.add_argument("--compact", action="store_true", help="send compact state records instead of raw screens")
+    parser.add_argument("--cache", metavar="PATH", help="reuse decisions for repeated game states, persisted to PATH")
+    parser.add_argument("--transcript", metavar="PATH", help="log every step as JSON lines to PATH (rotated and gzipped)")
+    parser.add_argument("--max-log-mb", type=float, default=10.0, help="rotate the transcript at this size")
+    parser.add_argument("--console", choices=CONSOLE_MODES, default="off", help="mirror steps to the console")
+    args = parser.parse_args()
+
+    cache = DecisionCache(path=args.cache) if args.cache else None
+    transcript = None
+    if args.transcript or args.console != "off":
+        transcript = Transcript(args.transcript, int(args.max_log_mb * 1024 * 1024), console=args.console)
+    try:
+        summary = asyncio.run(run_games(args.games, args.concurrency, args.command, args.server, args.batch,
+                                        args.max_turns, args.delay, cache, args.compact, transcript))
+    finally:
+        if transcript is not None:
+            transcript.close()
+    turns = [g["turns"] for g in summary["games"]]
+    print(f"{len(turns)} games, {sum(turns)} turns in {summary['elapsed']:.1f}s "
+          f"({sum(turns) / summary['elapsed']:.1f} turns/s)")
+    print(f"Model requests: {summary['model_requests']} ({summary['batched_requests']} batched)")
+    print(f"Turns per game: min {min(turns)}, mean {sum(turns) / len(turns):.1f}, max {max(turns)}")
+    if args.compact:
+        print(f"Tokens saved by compaction: {sum(g['tokens_saved'] for g in summary['games'])}")
+    if cache is not None:
+        print(cache.report())
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Streaming statistics over agent logs, driver transcripts and game journals.
+
+    python analyze.py log.log runs/ journals/ --jobs 4 --out runs.csv
+
+Understands three kinds of file, told apart by their first line:
+
+    agent logs    the GitHub agent's console log (log.log): a run starts at
+                  "AGENT HANDLING TASK", counts "STEP n/N" lines, "🤖 <ACTION>"
+                  lines and "TEST FAILED with return code"/"TEST SUCCEEDED"
+    transcripts   transcript.py JSON lines, one per driver step, with rotated
+                  "<name>.<n>.gz" archives read oldest first as one stream
+    journals      replay.py session journals (start/input/load/end records)
+
+Files are read a line at a time through generators and each run is reduced to
+a few counters as soon as it ends, so memory does not grow with the size of
+the logs; step times go into a log-scale histogram rather than a list. With
+--jobs N the files (a rotated transcript set counts as one) are spread over N
+processes and their summaries merged.
+
+The report gives, per kind of file: runs, steps, how many runs failed (agent
+runs that never reached TASK FINISHED, games that ended in death), failed
+tests, the most common actions, time per step and survival turns per run.
+--out writes one row per run as CSV (.csv), columnar JSON (.json) or Parquet
+(.parquet, needs pyarrow).
+"""
+import argparse
+import csv
+import gzip
+import json
+import math
+import os
+import re
+import statistics
+from collections import Counter
+from itertools import chain
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+COLUMNS = ("source", "run", "kind", "steps", "outcome", "failures", "checks", "mean_step_ms")
+FAILED_OUTCOMES = ("died", "gave_up")
+HIST_BASE = 1.1
+
+TASK_START = "AGENT HANDLING TASK"
+TASK_END = "--- AGENT CONCLUDED TASK ---"
+STEP = re.compile(r"STEP (\d+)/(\d+) \| AI THOUGHT")
+ACTION = re.compile(r"\U0001F916 ([A-Z][A-Z ]*[A-Z])")
+ROTATED = re.compile(r"^(.*)\.(\d+)\.gz$")
+
+
+class Run:
+    """One agent task or game, reduced to counters."""
+    __slots__ = ("source", "run", "kind", "steps", "outcome", "failures", "checks", "actions",
+                 "step_ms", "timed_steps", "hist")
+
+    def __init__(self, source: str, run: str, kind: str):
+        self.source, self.run, self.kind = source, run, kind
+        self.steps = self.failures = self.checks = self.timed_steps = 0
+        self.step_ms = 0.0
+        self.outcome = "incomplete"
+        self.actions: Counter = Counter()
+        self.hist: Counter = Counter()
+
+    def time_step(self, ms: float):
+        self.step_ms += ms
+        self.timed_steps += 1
+        self.hist[round(math.log(max(ms, 0.01), HIST_BASE))] += 1
+
+    def row(self) -> tuple:
+        mean = round(self.step_ms / self.timed_steps, 1) if self.timed_steps else None
+        return (self.source, self.run, self.kind, self.steps, self.outcome, self.failures, self.checks, mean)
+
+
+class Summary:
+    """Totals per kind of file plus one row per run; merge() combines workers' results."""
+
+    def __init__(self):
+        self.rows: List[tuple] = []
+        self.actions: Dict[str, Counter] = {}
+        self.hist: Dict[str, Counter] = {}
+
+    def add(self, run: Run):
+        self.rows.append(run.row())
+        self.actions.setdefault(run.kind, Counter()).update(run.actions)
+        self.hist.setdefault(run.kind, Counter()).update(run.hist)
+
+    def merge(self, other: "Summary") -> "Summary":
+        self.rows += other.rows
+        for kind, actions in other.actions.items():
+            self.actions.setdefault(kind, Counter()).update(actions)
+        for kind, hist in other.hist.items():
+            self.hist.setdefault(kind, Counter()).update(hist)
+        return self
+
+    def report(self, top: int = 8) -> str:
+        out = []
+        for kind in sorted({row[2] for row in self.rows}):
+            rows = [r for r in self.rows if r[2] == kind]
+            steps = [r[3] for r in rows]
+            failed = sum(r[4] in FAILED_OUTCOMES for r in rows)
+            failures, checks = sum(r[5] for r in rows), sum(r[6] for r in rows)
+            out.append(f"== {kind}: {len(rows)} runs, {sum(steps)} steps ==")
+            out.append(f"failed runs: {failed}/{len(rows)} ({failed / len(rows):.0%})")
+            if checks:
+                out.append(f"failed tests: {failures}/{checks} ({failures / checks:.0%})")
+            out.append(f"survival turns per run: mean {statistics.mean(steps):.1f}, "
+                       f"median {statistics.median(steps):g}, max {max(steps)}")
+            hist = self.hist.get(kind)
+            if hist:
+                out.append("time per step: " + ", ".join(f"p{int(q * 100)} {histogram_percentile(hist, q):.0f} ms"
+                                                         for q in (0.5, 0.9, 0.99)))
+            actions = self.actions.get(kind, Counter())
+            total = sum(actions.values())
+            if total:
+                out.append("actions: " + ", ".join(f"{a} {n / total:.0%}" for a, n in actions.most_common(top)))
+            outcomes = Counter(r[4] for r in rows)
+            out.append("outcomes: " + ", ".join(f"{o} {n}" for o, n in outcomes.most_common()))
+        return "\n".join(out)
+
+
+def histogram_percentile(hist: Counter, q: float) -> float:
+    target, seen = q * sum(hist.values()), 0
+    for bucket in sorted(hist):
+        seen += hist[bucket]
+        if seen >= target:
+            return HIST_BASE ** bucket
+    return 0.0
+
+
+def read_lines(path: str) -> Iterator[str]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        yield from f
+
+
+def agent_log_runs(lines: Iterable[str], source: str) -> Iterator[Run]:
+    run: Optional[Run] = None
+    limit = 0
+    tasks = 0
+    for line in lines:
+        if TASK_START in line:
+            if run is not None:
+                yield run
+            tasks += 1
+            run, limit = Run(source, f"task {tasks}", "agent"), 0
+        elif run is None:
+            continue
+        elif TASK_END in line:
+            if run.outcome != "finished":
+                run.outcome = "gave_up" if limit and run.steps >= limit else "incomplete"
+            yield run
+            run = None
+        elif (m := STEP.search(line)) is not None:
+            run.steps, limit = int(m.group(1)), int(m.group(2))
+        elif (m := ACTION.search(line)) is not None:
+            run.actions[m.group(1)] += 1
+            if m.group(1) == "TASK FINISHED":
+                run.outcome = "finished"
+        elif line.startswith("TEST FAILED"):
+            run.failures += 1
+            run.checks += 1
+        elif line.startswith("TEST SUCCEEDED"):
+            run.checks += 1
+    if run is not None:
+        yield run
+
+
+def transcript_runs(records: Iterable[dict], source: str) -> Iterator[Run]:
+    games: Dict[object, Run] = {}
+    last_step = 0
+    for record in records:
+        # Steps count up through one driver session; a smaller one starts the next.
+        if record["step"] < last_step:
+            yield from games.values()
+            games = {}
+        last_step = record["step"]
+        key = record.get("game", 1)
+        run = games.get(key)
+        if run is None:
+            run = games[key] = Run(source, f"game {key}", "transcript")
+        run.steps += 1
+        action = str(record.get("action", "")).strip().lower()
+        run.actions[action.split()[0] if action else "(none)"] += 1
+        if record.get("latency_ms") is not None:
+            run.time_step(record["latency_ms"])
+        screen = record.get("observation", "")
+        if "Game Over" in screen or "DEFEATED" in screen:
+            run.outcome = "died"
+        elif "Farewell" in screen:
+            run.outcome = "quit"
+    yield from games.values()
+
+
+def journal_runs(records: Iterable[dict], source: str) -> Iterator[Run]:
+    run: Optional[Run] = None
+    sessions = 0
+    for record in records:
+        kind = record.get("type")
+        if kind == "start":
+            if run is not None:
+                yield run
+            sessions += 1
+            run = Run(source, f"session {sessions} (seed {record.get('seed')})", "journal")
+        elif run is None:
+            continue
+        elif kind == "input":
+            run.steps += 1
+            run.actions[f"{record.get('prompt_id')}:{str(record.get('reply', '')).strip().lower()}"] += 1
+        elif kind == "end":
+            final = record.get("final") or {}
+            run.outcome = "died" if final.get("health", 1) <= 0 else "quit"
+            yield run
+            run = None
+    if run is not None:
+        yield run
+
+
+def json_records(lines: Iterable[str]) -> Iterator[dict]:
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def file_runs(paths: List[str]) -> Iterator[Run]:
+    """Runs in `paths`, read in order as one stream (a rotated set, oldest first)."""
+    lines = chain.from_iterable(read_lines(p) for p in paths)
+    source = paths[-1]
+    first = next(lines, None)
+    if first is None:
+        return
+    lines = chain([first], lines)
+    if not first.lstrip().startswith("{"):
+        yield from agent_log_runs(lines, source)
+        return
+    records = json_records(lines)
+    if "type" in json.loads(first):
+        yield from journal_runs(records, source)
+    else:
+        yield from transcript_runs(records, source)
+
+
+def analyze_group(paths: List[str]) -> Summary:
+    summary = Summary()
+    for run in file_runs(paths):
+        summary.add(run)
+    return summary
+
+
+def group_files(paths: Iterable[str]) -> List[List[str]]:
+    """Expands directories and groups rotated archives with their live file, oldest first."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files += [os.path.join(root, n) for n in sorted(names)
+                          if n.endswith((".log", ".jsonl", ".gz"))]
+        else:
+            files.append(path)
+    groups: Dict[str, List[Tuple[int, str]]] = {}
+    for f in files:
+        m = ROTATED.match(f)
+        base, index = (m.group(1), int(m.group(2))) if m else (f, 0)
+        groups.setdefault(base, []).append((index, f))
+    return [[f for _, f in sorted(members, reverse=True)] for _, members in sorted(groups.items())]
+
+
+def analyze(paths: Iterable[str], jobs: int = 1) -> Summary:
+    groups = group_files(paths)
+    total = Summary()
+    if jobs > 1 and len(groups) > 1:
+        with Pool(min(jobs, len(groups))) as pool:
+            for summary in pool.imap(analyze_group, groups):
+                total.merge(summary)
+    else:
+        for group in groups:
+            total.merge(analyze_group(group))
+    return total
+
+
+def write_rows(summary: Summary, path: str):
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(summary.rows)
+        return
+    columns = {name: [row[i] for row in summary.rows] for i, name in enumerate(COLUMNS)}
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Writing .parquet needs pyarrow (pip install pyarrow); use .csv or .json instead")
+        pyarrow.parquet.write_table(pyarrow.table(columns), path)
+        return
+    with open(path, "w") as f:
+        json.dump({"columns": columns, "actions": {k: dict(v) for k, v in summary.actions.items()}}, f)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise agent logs, driver transcripts and game journals.")
+    parser.add_argument("paths", nargs="+", help="files or directories")
+    parser.add_argument("--jobs", type=int, default=1, help="analyze files in this many processes")
+    parser.add_argument("--out", metavar="PATH", help="write one row per run to PATH (.csv, .json or .parquet)")
+    parser.add_argument("--top", type=int, default=8, help="actions to list per kind")
+    args = parser.parse_args()
+
+    summary = analyze(args.paths, args.jobs)
+    if not summary.rows:
+        raise SystemExit("No runs found")
+    print(summary.report(args.top))
+    if args.out:
+        write_rows(summary, args.out)
+        print(f"{len(summary.rows)} runs written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Saves the character in the background while the game runs.
+
+At every prompt GameUI calls Autosaver.checkpoint(). When Player.revision
+differs from the last snapshot it takes a player_to_dict() snapshot (a handful
+of fields plus the inventory counts, so cheap however many items there are)
+and hands it to an AutosaveWriter, due `interval` seconds after the previous
+write. The writer's thread waits for that time on its own, so a change is on
+disk within the interval even if the player then sits at a prompt, and does
+the JSON encoding and the store write, so input is never held up by the disk.
+Snapshots of a character that arrive while an earlier one is still waiting
+replace it and keep its due time, so a burst of changes costs one write, and
+every write goes through the store's atomic save_dict().
+
+    saver = Autosaver(store, lambda: gc.player, interval=5.0)
+    gc.ui.autosaver = saver
+    ...
+    saver.close()                  # writes the latest state and waits for it
+
+A dead character is never snapshotted: after a game over, Continue resumes
+from the last autosave before the fatal battle. A failed write is reported on
+stderr at once and, through take_error(), on the player's next screen.
+"""
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from models import Player
+from saves import player_to_dict
+
+
+class AutosaveWriter:
+    """One background thread writing the newest snapshot of each character.
+
+    A single writer can serve any number of Autosavers (server.py shares one
+    between all sessions).
+    """
+
+    def __init__(self):
+        # (store id, name) -> (store, newest snapshot, time.monotonic() it is due)
+        self._pending: Dict[Tuple[int, str], Tuple[object, dict, float]] = {}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self.writes = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._failed: Dict[Tuple[int, str], Exception] = {}   # latest error per character, until taken
+        self._thread = threading.Thread(target=self._run, daemon=True, name="autosave")
+        self._thread.start()
+
+    def submit(self, store, data: dict, delay: float = 0.0):
+        """Writes `data` in `delay` seconds, or with the snapshot it replaces if that is due sooner."""
+        due = time.monotonic() + delay
+        with self._cond:
+            key = (id(store), data["name"])
+            if key in self._pending:
+                self.coalesced += 1
+                due = min(due, self._pending[key][2])
+            self._pending[key] = (store, data, due)
+            self._cond.notify_all()
+
+    def _due(self) -> Dict[Tuple[int, str], Tuple[object, dict, float]]:
+        """Takes the snapshots that are due; waits (holding _cond) until there are some."""
+        while True:
+            now = time.monotonic()
+            due = {key: entry for key, entry in self._pending.items() if entry[2] <= now or self._closed}
+            if due or not self._pending and self._closed:
+                for key in due:
+                    del self._pending[key]
+                return due
+            self._cond.wait(min(entry[2] for entry in self._pending.values()) - now if self._pending else None)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._due()
+                if not batch:
+                    return
+                self._busy = True
+            for key, (store, data, _) in batch.items():
+                try:
+                    store.save_dict(data)
+                    self.writes += 1
+                    self._failed.pop(key, None)
+                except Exception as e:
+                    self.errors += 1
+                    self._failed[key] = e
+                    print(f"Autosave of {data['name']!r} failed: {e}", file=sys.stderr)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def take_error(self, store, name: str) -> Optional[Exception]:
+        """The error from the last failed write of `name`, once; None if it has not failed since."""
+        return self._failed.pop((id(store), name), None)
+
+    def flush(self):
+        """Writes everything submitted so far now and blocks until it is on disk."""
+        with self._cond:
+            self._pending = {key: (store, data, 0.0) for key, (store, data, _) in self._pending.items()}
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                self._cond.wait()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+class Autosaver:
+    def __init__(self, store, source: Callable[[], Optional[Player]], interval: float = 5.0,
+                 writer: AutosaveWriter = None, clock: Callable[[], float] = time.monotonic):
+        self.store = store
+        self.source = source
+        self.interval = interval
+        self.clock = clock
+        self.writer = writer or AutosaveWriter()
+        self._owns_writer = writer is None
+        self._saved = None
+        self._last = None
+
+    def checkpoint(self, force: bool = False):
+        """Queues a snapshot if the character changed, due once the interval since the last write is up."""
+        player = self.source()
+        if player is None or player.health <= 0:
+            return
+        revision = player.revision
+        if revision == self._saved:
+            return
+        now = self.clock()
+        delay = 0.0 if force or self._last is None else max(0.0, self._last + self.interval - now)
+        self._saved = revision
+        self._last = now + delay
+        self.writer.submit(self.store, player_to_dict(player), delay)
+
+    def take_error(self) -> Optional[Exception]:
+        """Why the last write of this character failed, once; the next checkpoint then retries it."""
+        player = self.source()
+        error = self.writer.take_error(self.store, player.name) if player is not None else None
+        if error is not None:
+            self._saved = None
+        return error
+
+    def flush(self):
+        """Queues any unsaved changes and waits until they are written."""
+        self.checkpoint(force=True)
+        self.writer.flush()
+
+    def close(self):
+        self.flush()
+        if self._owns_writer:
+            self.writer.close()
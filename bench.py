@@ -0,0 +1,306 @@
+"""Seeded performance benchmarks with a committed baseline.
+
+    python bench.py                    # run everything, compare with bench_baseline.json
+    python bench.py --only battles     # run some scenarios
+    python bench.py --update-baseline  # record this machine's numbers as the baseline
+
+Each scenario builds its fixture untimed, then times one call and reports
+operations per second (best of --repeat runs). The memory_* scenarios report
+the bytes tracemalloc sees allocated per game session, player or enemy. A
+scenario fails when it is more than --threshold slower (or bigger) than the
+baseline; the exit code is 1 if any fail. Timings on a shared host swing by
++-40%, so a scenario that looks slower is measured again up to --confirm
+times and only fails if every measurement is slow; the disk-bound save
+scenarios also get a wider tolerance (TOLERANCE).
+Baselines are machine-specific, so refresh them when the benchmark host changes.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import gc as gc_module
+from typing import Callable, Dict, Tuple
+
+from content import ContentRegistry
+from engine import GameController
+from models import Item, Player, RESOURCES, ITEMS, ENEMY_TEMPLATES, EnemyPool, enemy_templates
+from replay import ScriptedUI
+from saves import JsonSaveStore, SqliteSaveStore
+from session import GameSession
+from ui import GameUI, NullUI
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+SEED = 1234
+# Per-scenario --threshold overrides for scenarios dominated by file system latency.
+TOLERANCE = {"save_load_json": 0.5, "save_load_sqlite": 0.5}
+
+# A scenario takes a scale factor, builds its fixture and returns (run, ops):
+# run() is the timed part and performs `ops` operations.
+Scenario = Callable[[float], Tuple[Callable[[], None], int]]
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(func: Scenario) -> Scenario:
+    SCENARIOS[func.__name__.replace("bench_", "")] = func
+    return func
+
+
+def _controller(mode: str = "normal", level: int = 1) -> GameController:
+    gc = GameController(rng=random.Random(SEED))
+    gc.ui = NullUI()
+    gc.player = Player("Bench", mode)
+    for _ in range(level - 1):
+        gc.player.level_up()
+    return gc
+
+
+def _big_inventory(player: Player, units: int):
+    weights = [40, 25, 15, 10, 5, 3, 1.5, 0.5]
+    total = sum(weights)
+    for name, w in zip(RESOURCES, weights):
+        player.inventory.add(name, int(units * w / total))
+    for name in ITEMS:
+        player.inventory.add(name, 3)
+
+
+@scenario
+def bench_battles(scale: float):
+    gc = _controller(level=5)
+    battles = max(1, int(20000 * scale))
+
+    def run():
+        for _ in range(battles):
+            gc.player.health = gc.player.max_health
+            enemy = gc.create_enemy()
+            while enemy.health > 0 and gc.player.health > 0:
+                gc.attack(enemy)
+            gc.end_battle(enemy)
+    return run, battles
+
+
+@scenario
+def bench_sell_all(scale: float):
+    gc = _controller()
+    _big_inventory(gc.player, int(1_000_000 * scale))
+    stock = dict(gc.player.inventory.counts())
+    cycles = max(1, int(2000 * scale))
+    gc.ui = ScriptedUI(["A"] * cycles)
+
+    def run():
+        for _ in range(cycles):
+            gc.sell_resources()
+            for name in RESOURCES:
+                gc.player.inventory.add(name, stock[name])
+    return run, cycles
+
+
+@scenario
+def bench_use_item_menu(scale: float):
+    gc = _controller()
+    _big_inventory(gc.player, int(1_000_000 * scale))
+    listings = max(1, int(5000 * scale))
+    gc.ui = ScriptedUI(["c"] * listings)
+
+    def run():
+        for _ in range(listings):
+            gc.use_item_menu()
+    return run, listings
+
+
+@scenario
+def bench_shop_bulk_buy(scale: float):
+    gc = _controller()
+    purchases = max(1, int(3000 * scale))
+    gc.player.coins = 10**12
+    gc.ui = ScriptedUI(["1", "100000"] * purchases)
+
+    def run():
+        for _ in range(purchases):
+            gc.shop()
+    return run, purchases
+
+
+@scenario
+def bench_shop_modded_catalog(scale: float):
+    gc = _controller()
+    items = {f"Modded Item {i}": Item(f"Modded Item {i}", 10 + i, "attack_boost", 1 + i % 50) for i in range(5000)}
+    gc.content = ContentRegistry(items, RESOURCES, ENEMY_TEMPLATES)
+    visits = max(1, int(20000 * scale))
+    gc.ui = ScriptedUI(["0"] * visits)
+
+    def run():
+        for _ in range(visits):
+            gc.shop()
+    return run, visits
+
+
+@scenario
+def bench_mining(scale: float):
+    gc = _controller()
+    digs = max(1, int(1_000_000 * scale))
+
+    def run():
+        gc.mine(digs)
+    return run, digs
+
+
+def _round_trips(store, scale: float, trips: int):
+    gc = _controller()
+    gc.store = store
+    _big_inventory(gc.player, int(1_000_000 * scale))
+    trips = max(1, int(trips * scale))
+    gc.ui = ScriptedUI(["Bench"] * trips)
+
+    def run():
+        for _ in range(trips):
+            gc.save_game()
+            gc.load_game()
+    return run, trips
+
+
+@scenario
+def bench_save_load_json(scale: float):
+    return _round_trips(JsonSaveStore(tempfile.mkdtemp(prefix="bench_")), scale, 800)
+
+
+@scenario
+def bench_save_load_sqlite(scale: float):
+    return _round_trips(SqliteSaveStore(os.path.join(tempfile.mkdtemp(prefix="bench_"), "saves.db")), scale, 2000)
+
+
+@scenario
+def bench_render_screens(scale: float):
+    gc = _controller()
+    _big_inventory(gc.player, 10_000)
+    screens = max(1, int(5000 * scale))
+    out = io.StringIO()
+    gc.ui = GameUI(stream=out)
+
+    def run():
+        for _ in range(screens):
+            gc.ui.clear()
+            gc.ui.print_status(gc.player)
+            gc.ui.print_header("VILLAGE SHOP")
+            for i, (name, item) in enumerate(ITEMS.items()):
+                gc.ui.print_table_row([i + 1, name, item.price, item.item_type], [4, 25, 8, 15])
+            gc.ui.flush()
+            out.seek(0)
+            out.truncate()
+    return run, screens
+
+
+def _sessions(n: int):
+    sessions = [GameSession(f"S{i}", seed=i) for i in range(n)]
+    for session in sessions:
+        session.reset()
+    return sessions
+
+
+def _enemy_pool(n: int):
+    pool = EnemyPool()
+    pool.spawn_many(1, n, random.Random(SEED))
+    return pool
+
+
+# Memory scenarios build `n` of something and report bytes per unit (lower is better).
+MEMORY_SCENARIOS: Dict[str, Callable[[int], object]] = {
+    "session": _sessions,
+    "player": lambda n: [Player(f"P{i}") for i in range(n)],
+    "enemy": lambda n: [enemy_templates("normal")[i % 3].spawn(1) for i in range(n)],
+    "enemy_pool": _enemy_pool,
+}
+
+
+def measure_memory(name: str, count: int = 2000) -> float:
+    """Bytes still allocated per unit after building `count` of them."""
+    gc_module.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = MEMORY_SCENARIOS[name](count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return (after - before) / count
+
+
+def run_scenario(name: str, scale: float = 1.0, repeat: int = 5) -> float:
+    """Best operations per second over `repeat` fresh runs of one scenario."""
+    best = 0.0
+    for _ in range(repeat):
+        run, ops = SCENARIOS[name](scale)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = max(best, ops / max(elapsed, 1e-9))
+    return best
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks.")
+    parser.add_argument("--only", nargs="+", help="scenarios to run",
+                        choices=sorted(SCENARIOS) + [f"memory_{name}" for name in MEMORY_SCENARIOS])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply fixture sizes and iteration counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="fail when a scenario is this fraction slower (or bigger) than its baseline")
+    parser.add_argument("--confirm", type=int, default=3,
+                        help="re-measure a scenario that looks slower up to this many times before failing it")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    failed = []
+    names = args.only or list(SCENARIOS) + [f"memory_{name}" for name in MEMORY_SCENARIOS]
+    print(f"{'scenario':<22} {'result':>12} {'baseline':>12} {'change':>8}")
+    for name in names:
+        threshold = TOLERANCE.get(name, args.threshold)
+        base = baseline.get(name)
+        if name.startswith("memory_"):
+            value, unit = measure_memory(name[len("memory_"):]), "B/obj"
+            slower = lambda change: change > threshold
+        else:
+            value, unit = run_scenario(name, args.scale, args.repeat), "ops/s"
+            slower = lambda change: change < -threshold
+            for _ in range(args.confirm if base and not args.update_baseline else 0):
+                if not slower(value / base - 1):
+                    break
+                value = max(value, run_scenario(name, args.scale, args.repeat))
+        results[name] = round(value, 2)
+        if base:
+            change = value / base - 1
+            flag = ""
+            if slower(change):
+                failed.append(name)
+                flag = "  REGRESSION"
+            print(f"{name:<22} {value:>12,.1f} {base:>12,.1f} {change:>+7.0%}{flag}  {unit}")
+        else:
+            print(f"{name:<22} {value:>12,.1f} {'-':>12} {'-':>8}  {unit}")
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    elif failed:
+        print(f"\n{len(failed)} scenario(s) regressed past their threshold ({args.threshold:.0%} unless in "
+              f"TOLERANCE): {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""The game's content, compiled once into lookup indexes and ready-made screens.
+
+models.py reads items, resources and enemies from data/*.json (or
+$RPG_CONTENT_DIR). ContentRegistry adds what the game looks things up by:
+
+- items by item_type, by price (for "what can I afford" queries) and by the
+  level at which the shop unlocks them;
+- the shop screen for each unlock level, already formatted, with its reply
+  options, so a visit writes one string however big the catalog is;
+- the fixed columns of every sell-table row;
+- the mining sampler for its resources' weights and success chance.
+
+Items are the same Item objects as models.ITEMS, with interned names, so the
+indexes add references rather than copies.
+
+    CONTENT.by_type["heal"]            # cheapest-first tuple of Items
+    CONTENT.affordable(250)            # every item costing <= 250
+    CONTENT.shop_table(player.level)   # ShopTable(text, names, options)
+"""
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from models import (Item, EnemyTemplate, ResourceSampler, ITEMS, RESOURCES, ENEMY_TEMPLATES, MINING_SAMPLER,
+                    load_content, parse_items, parse_resources, parse_enemies, enemy_templates_from)
+from ui import GameUI
+
+SHOP_WIDTHS = [4, 25, 8, 15]
+SELL_WIDTHS = [4, 15, 8, 8]
+
+
+class ShopTable(NamedTuple):
+    text: str
+    names: Tuple[str, ...]
+    options: Dict[str, str]
+
+
+def effect_label(item: Item) -> str:
+    return f"+{item.bonus} {item.item_type.split('_')[0]}"
+
+
+class ContentRegistry:
+    def __init__(self, items: Dict[str, Item], resources: Dict[str, int],
+                 enemies: Dict[str, Tuple[EnemyTemplate, ...]], sampler: ResourceSampler = MINING_SAMPLER):
+        self.items = items
+        self.resources = resources
+        self.enemies = enemies
+        self.sampler = sampler
+
+        self.by_price: Tuple[Item, ...] = tuple(sorted(items.values(), key=lambda i: (i.price, i.name)))
+        by_type: Dict[str, List[Item]] = {}
+        for item in self.by_price:
+            by_type.setdefault(item.item_type, []).append(item)
+        self.by_type: Dict[str, Tuple[Item, ...]] = {t: tuple(group) for t, group in by_type.items()}
+        self._prices = [item.price for item in self.by_price]
+        self.price_rank = {item.name: rank for rank, item in enumerate(self.by_price)}
+
+        # One shop screen per level at which something new unlocks.
+        self.unlock_levels: List[int] = sorted({1} | {item.level for item in items.values()})
+        self.level_bands: List[Tuple[Item, ...]] = [
+            tuple(item for item in items.values() if item.level <= level) for level in self.unlock_levels]
+        self._shops = [self._render_shop(band) for band in self.level_bands]
+
+        self.sell_rows = {name: GameUI.format_table_row([name, price], SELL_WIDTHS[1:3]) + " | "
+                          for name, price in resources.items()}
+
+    @classmethod
+    def load(cls, directory: str = None) -> "ContentRegistry":
+        """A registry for the content files in `directory` (missing files fall back to data/)."""
+        resources, weights, success_chance = parse_resources(load_content("resources", directory))
+        return cls(parse_items(load_content("items", directory)), resources,
+                   enemy_templates_from(parse_enemies(load_content("enemies", directory))),
+                   ResourceSampler(weights, success_chance))
+
+    @staticmethod
+    def _render_shop(items: Tuple[Item, ...]) -> ShopTable:
+        lines = [GameUI.format_table_row(["#", "Item Name", "Price", "Effect"], SHOP_WIDTHS), "-" * 55]
+        for i, item in enumerate(items):
+            lines.append(GameUI.format_table_row([i + 1, item.name, item.price, effect_label(item)], SHOP_WIDTHS))
+        lines += ["", "R. Recommend purchases", "S. Sell Resources", "0. Exit"]
+        names = tuple(item.name for item in items)
+        options = {**{str(i + 1): name for i, name in enumerate(names)},
+                   "R": "Recommend purchases", "S": "Sell Resources", "0": "Exit"}
+        return ShopTable("\n".join(lines), names, options)
+
+    def level_band(self, level: int) -> int:
+        """Index into level_bands of the items a `level` character can buy."""
+        return max(0, bisect_right(self.unlock_levels, level) - 1)
+
+    def shop_table(self, level: int) -> ShopTable:
+        return self._shops[self.level_band(level)]
+
+    def affordable(self, coins: int, level: Optional[int] = None) -> Tuple[Item, ...]:
+        """Items costing at most `coins`, cheapest first; only those unlocked at `level` if given."""
+        items = self.by_price[:bisect_right(self._prices, coins)]
+        if level is not None:
+            items = tuple(item for item in items if item.level <= level)
+        return items
+
+    def sell_row(self, number: int, name: str, owned: int) -> str:
+        return f"{number:<4} | {self.sell_rows[name]}{owned:<8}"
+
+    def enemy_templates(self, mode: str) -> Tuple[EnemyTemplate, ...]:
+        return self.enemies.get(mode) or self.enemies["normal"]
+
+
+CONTENT = ContentRegistry(ITEMS, RESOURCES, ENEMY_TEMPLATES)
@@ -0,0 +1,117 @@
+"""LRU cache of AI decisions keyed on a normalized game screen.
+
+Two screens that differ only in colors, exact HP or exact coin counts map to
+the same key, so the main menu at full health or a fight against the same
+enemy tier is answered from memory instead of another model round trip.
+A decision that leads straight back to a screen with the same key did nothing
+(an invalid reply the game re-prompts for), so players evict it and ask the
+model again rather than replaying it forever.
+Entries can optionally persist to a SQLite file between runs.
+"""
+import hashlib
+import math
+import re
+import sqlite3
+from collections import OrderedDict
+from typing import Optional
+
+from ui import strip_ansi
+
+NUMBERS = re.compile(r"(\d+)\s*/\s*(\d+)|\d+")
+HEALTH_BAR = re.compile(r"\[[#-]+\]")
+
+
+def normalize(screen: str, buckets: int = 10) -> str:
+    """Reduces a screen to the parts that should drive a decision.
+
+    Fractions such as HP 73/100 are rounded up to a bucket (8/10), other
+    numbers of 10 or more become their order of magnitude, and health bars
+    and whitespace runs are dropped.
+    """
+    text = HEALTH_BAR.sub("", strip_ansi(screen))
+
+    def bucket(m):
+        if m.group(1) is not None:
+            cur, top = int(m.group(1)), int(m.group(2)) or 1
+            return f"{-(-max(0, cur) * buckets // top)}/{buckets}"
+        value = int(m.group())
+        return m.group() if value < 10 else f"~1e{int(math.log10(value))}"
+
+    return " ".join(NUMBERS.sub(bucket, text).split())
+
+
+class DecisionCache:
+    def __init__(self, capacity: int = 4096, path: Optional[str] = None, buckets: int = 10):
+        self.capacity = capacity
+        self.buckets = buckets
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._unsaved = {}
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS decisions (key TEXT PRIMARY KEY, thought TEXT, action TEXT)")
+
+    def key(self, screen: str) -> str:
+        return hashlib.sha1(normalize(screen, self.buckets).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        decision = self._entries.get(key)
+        if decision is None and self._db is not None:
+            row = self._db.execute("SELECT thought, action FROM decisions WHERE key = ?", (key,)).fetchone()
+            if row:
+                decision = {"thought": row[0], "action": row[1]}
+                self._store(key, decision)
+        if decision is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(decision)
+
+    def put(self, key: str, decision: dict):
+        self._store(key, {"thought": decision["thought"], "action": decision["action"]})
+        if self._db is not None:
+            self._unsaved[key] = self._entries[key]
+            if len(self._unsaved) >= 64:
+                self.flush()
+
+    def evict(self, key: str):
+        """Forgets `key`, e.g. once its decision turned out to leave the screen unchanged."""
+        self._entries.pop(key, None)
+        self._unsaved.pop(key, None)
+        if self._db is not None:
+            with self._db:
+                self._db.execute("DELETE FROM decisions WHERE key = ?", (key,))
+
+    def _store(self, key: str, decision: dict):
+        self._entries[key] = decision
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def flush(self):
+        if self._db is not None and self._unsaved:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO decisions (key, thought, action) VALUES (?, ?, ?)",
+                    [(k, d["thought"], d["action"]) for k, d in self._unsaved.items()])
+            self._unsaved.clear()
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def report(self) -> str:
+        return f"Decision cache: {self.hits} hits / {self.hits + self.misses} lookups ({self.hit_rate:.0%}), {len(self)} entries"
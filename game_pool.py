@@ -0,0 +1,231 @@
+"""Pre-warmed game processes that are reused across games.
+
+Starting `python main.py` for every game pays for a new interpreter and all
+the imports before the first screen appears. A worker (`main.py --worker`)
+instead plays one game after another in the same process. The GamePool keeps
+workers parked at the first prompt of a fresh game, so acquiring one costs
+about as much as reading a buffered screen:
+
+    pool = GamePool(size=2)
+    game = pool.acquire()          # same read_output/send_input/is_running as GameRunner
+    ...
+    pool.release(game)             # resets an unfinished game and parks the worker again
+    print(pool.report())
+
+The worker ends every prompt with PROMPT_END and every game with GAME_END, so
+the pool never has to guess where a screen stops. Sending RESET abandons the
+current game. Both markers are stripped before the text reaches the caller.
+"""
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from ui import GameUI
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_COMMAND = [sys.executable, os.path.join(GAME_DIR, "main.py"), "--worker", "--plain"]
+PROMPT_END = "\x00"
+GAME_END = "\x04"
+RESET = "\x18"
+
+
+class GameReset(Exception):
+    """Raised out of a prompt when the pool abandons the current game."""
+
+
+class WorkerUI(GameUI):
+    def ask(self, text: str, prompt_id: str = None, options: dict = None) -> str:
+        self.write(text + PROMPT_END)
+        self.flush()
+        reply = input()
+        if reply == RESET:
+            raise GameReset()
+        return reply
+
+
+def serve_games(store, seed: Optional[int] = None, plain: bool = True):
+    """The worker loop: a fresh GameController per game until stdin closes."""
+    from engine import GameController
+    from main import run_game
+
+    seeds = random.Random(seed)
+    while True:
+        gc = GameController(store, random.Random(seeds.getrandbits(64)))
+        gc.ui = WorkerUI(plain=plain)
+        try:
+            run_game(gc)
+        except GameReset:
+            pass
+        except EOFError:
+            return
+        gc.ui.write(GAME_END)
+        gc.ui.flush()
+
+
+class GameWorker:
+    def __init__(self, command: List[str] = None, cwd: str = GAME_DIR):
+        start = time.perf_counter()
+        self.process = subprocess.Popen(command or WORKER_COMMAND, cwd=cwd, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._pending = b""
+        self.games = 0
+        self.first_screen, _ = self.read_screen()
+        self.startup = time.perf_counter() - start
+
+    def read_screen(self) -> Tuple[str, bool]:
+        """Text up to the next prompt, and whether the game ended instead."""
+        buf = self._pending
+        fd = self.process.stdout.fileno()
+        while True:
+            prompt, end = buf.find(PROMPT_END.encode()), buf.find(GAME_END.encode())
+            if end != -1 and (prompt == -1 or end < prompt):
+                self._pending = buf[end + 1:]
+                return buf[:end].decode(errors="replace"), True
+            if prompt != -1:
+                self._pending = buf[prompt + 1:]
+                return buf[:prompt].decode(errors="replace"), False
+            data = os.read(fd, 65536)
+            if not data:
+                self._pending = b""
+                return buf.decode(errors="replace"), True
+            buf += data
+
+    def send(self, line: str):
+        self.process.stdin.write((line + "\n").encode())
+        self.process.stdin.flush()
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self):
+        if self.alive():
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+
+class PooledGame:
+    """One game on a pooled worker, with GameRunner's interface."""
+
+    def __init__(self, worker: GameWorker):
+        self.worker = worker
+        self.finished = False
+        self._first = worker.first_screen
+
+    def read_output(self) -> str:
+        if self._first is not None:
+            screen, self._first = self._first, None
+            return screen
+        if self.finished:
+            return ""
+        screen, self.finished = self.worker.read_screen()
+        return screen
+
+    def send_input(self, action: str):
+        # Once this game has ended the worker is already at the next game's
+        # first prompt, which a late reply must not answer.
+        if not self.finished:
+            self.worker.send(action)
+
+    def is_running(self) -> bool:
+        return not self.finished and self.worker.alive()
+
+
+class GamePool:
+    def __init__(self, size: int = 2, command: List[str] = None, cwd: str = GAME_DIR):
+        self.command = command
+        self.cwd = cwd
+        self.idle = deque(GameWorker(command, cwd) for _ in range(size))
+        self.startup_times = [w.startup for w in self.idle]
+        self.acquire_times: List[float] = []
+        self.reset_times: List[float] = []
+
+    def acquire(self) -> PooledGame:
+        start = time.perf_counter()
+        if self.idle:
+            worker = self.idle.popleft()
+        else:
+            worker = GameWorker(self.command, self.cwd)
+            self.startup_times.append(worker.startup)
+        worker.games += 1
+        game = PooledGame(worker)
+        self.acquire_times.append(time.perf_counter() - start)
+        return game
+
+    def release(self, game: PooledGame):
+        """Parks the worker at the first prompt of its next game."""
+        worker = game.worker
+        if game._first is not None:
+            self.idle.append(worker)
+            return
+        start = time.perf_counter()
+        if not game.finished and worker.alive():
+            worker.send(RESET)
+            while not game.finished:
+                _, game.finished = worker.read_screen()
+        if worker.alive():
+            worker.first_screen, ended = worker.read_screen()
+            if not ended:
+                self.reset_times.append(time.perf_counter() - start)
+                self.idle.append(worker)
+                return
+        worker.close()
+
+    def close(self):
+        while self.idle:
+            self.idle.popleft().close()
+
+    def report(self) -> str:
+        cold = statistics.median(self.startup_times) * 1000 if self.startup_times else 0.0
+        warm = statistics.median(self.acquire_times) * 1000 if self.acquire_times else 0.0
+        reset = statistics.median(self.reset_times) * 1000 if self.reset_times else 0.0
+        return (f"Game startup: {cold:.1f} ms per new worker ({len(self.startup_times)} started), "
+                f"{warm:.3f} ms to acquire a pooled game and {reset:.2f} ms to reset one "
+                f"({len(self.acquire_times)} games)")
+
+
+def cold_start(command: List[str] = None, cwd: str = GAME_DIR) -> float:
+    """Seconds for a fresh `python main.py` to reach its first prompt, as GameRunner starts it."""
+    start = time.perf_counter()
+    process = subprocess.Popen(command or [sys.executable, "main.py", "--plain"], cwd=cwd,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    process.stdout.read1(65536)
+    elapsed = time.perf_counter() - start
+    process.kill()
+    process.wait()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-game process startup with a warm worker pool.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    cold = [cold_start() for _ in range(min(args.games, 10))]
+    print(f"New process per game: {statistics.median(cold) * 1000:.1f} ms to first prompt")
+
+    pool = GamePool(args.workers)
+    try:
+        for i in range(args.games):
+            game = pool.acquire()
+            game.read_output()
+            for reply in ["n", f"Pool{i}", "normal", "3", "5"]:
+                game.send_input(reply)
+                game.read_output()
+            pool.release(game)
+        print(pool.report())
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,150 @@
+import argparse
+import os
 import random
+
+import metrics
+from autosave import Autosaver
 from engine import GameController
-from models import Player, RESOURCES, Colors
+from game_pool import serve_games
+from models import Player, Colors
+from saves import JsonSaveStore, SqliteSaveStore, valid_name
+from protocol import JsonlUI
+from replay import Journal, JournalingStore
+from script import run_script, print_summary
+from session import GameSession
 from ui import GameUI
 
-def main():
-    gc = GameController()
-    ui = GameUI()
-    
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CLI-based RPG")
+    parser.add_argument("--db", help="keep saves in this SQLite database instead of <name>_save.json files")
+    parser.add_argument("--plain", action="store_true", default=bool(os.environ.get("NO_COLOR")),
+                        help="no colors or screen clearing, for piped output")
+    parser.add_argument("--protocol", choices=["text", "jsonl"], default="text",
+                        help="jsonl: emit one JSON object per screen and read one JSON line per reply")
+    parser.add_argument("--seed", type=int, help="seed the game's random number generator")
+    parser.add_argument("--journal", metavar="PATH", help="append this session's seed and inputs to PATH for replay.py")
+    parser.add_argument("--script", metavar="FILE", help="run the commands in FILE without menus (see script.py)")
+    parser.add_argument("--exec", metavar="COMMANDS", help="run ';'-separated commands, e.g. 'mine 500; sell all'")
+    parser.add_argument("--name", default="Scripted", help="character for --script/--exec (loaded if saved)")
+    parser.add_argument("--mode", choices=list(MODES), default="normal", help="mode of a new --script/--exec character")
+    parser.add_argument("--autosave", type=float, metavar="SECONDS",
+                        help="save changes in the background at most every SECONDS, and on exit")
+    parser.add_argument("--worker", action="store_true",
+                        help="play games back to back for game_pool.GamePool instead of exiting after one")
+    parser.add_argument("--profile", metavar="PATH", nargs="?", const="game_metrics.json",
+                        help="run under cProfile, print the hot spots to stderr and write metrics JSON to PATH")
+    args = parser.parse_args(argv)
+    if not valid_name(args.name):
+        parser.error(f"invalid character name {args.name!r}")
+    return args
+
+MAIN_MENU = {
+    "1": "Explore the Wilds",
+    "2": "Visit the Shop",
+    "3": "Go Mining",
+    "4": "Save Progress",
+    "5": "Quit Game"
+}
+MODES = {"easy": "Easy", "normal": "Normal", "hardcore": "Hardcore"}
+
+def new_character(ui: GameUI) -> Player:
+    name = ui.prompt("Character Name: ", "name").strip()
+    while not valid_name(name):
+        ui.line("Names are up to 32 letters, digits, spaces, ' or -, starting with a letter or digit.")
+        name = ui.prompt("Character Name: ", "name").strip()
+    mode = ui.prompt("Mode (easy/normal/hardcore): ", "mode", MODES).lower()
+    return Player(name, mode)
+
+def run_game(gc: GameController):
+    ui = gc.ui
     ui.clear()
-    print(f"{Colors.BOLD}{Colors.CYAN}--- ENHANCED RPG EXPERIENCE ---{Colors.ENDC}")
+    ui.line(f"{Colors.BOLD}{Colors.CYAN}--- ENHANCED RPG EXPERIENCE ---{Colors.ENDC}")
     
-    if input("Continue previous adventure? (y/n): ").lower() == 'y':
+    if ui.prompt("Continue previous adventure? (y/n): ", "continue", {"y": "Yes", "n": "No"}).lower() == 'y':
         if not gc.load_game():
-            print("No save found. Starting anew.")
-            name = input("Character Name: ")
-            mode = input("Mode (easy/normal/hardcore): ").lower()
-            gc.player = Player(name, mode)
+            ui.line("No save found. Starting anew.")
+            gc.player = new_character(ui)
     else:
-        name = input("Character Name: ")
-        mode = input("Mode (easy/normal/hardcore): ").lower()
-        gc.player = Player(name, mode)
+        gc.player = new_character(ui)
 
     while gc.player.health > 0:
+        gc.collect_mining()
         ui.print_status(gc.player)
-        print("\nWhat will you do?")
-        print("1. Explore the Wilds")
-        print("2. Visit the Shop")
-        print("3. Go Mining")
-        print("4. Save Progress")
-        print("5. Quit Game")
+        ui.line("\nWhat will you do?")
+        for key, label in MAIN_MENU.items():
+            ui.line(f"{key}. {label}")
         
-        choice = input("> ")
+        choice = ui.prompt("> ", "main_menu", MAIN_MENU)
         
         if choice == '1':
             if not gc.battle():
-                print(f"{Colors.FAIL}Game Over, {gc.player.name}.{Colors.ENDC}")
+                ui.line(f"{Colors.FAIL}Game Over, {gc.player.name}.{Colors.ENDC}")
+                if ui.autosaver is not None:
+                    ui.autosaver.flush()
                 break
         elif choice == '2':
             gc.shop()
         elif choice == '3':
             ui.print_header("MINING")
-            print("Digging for resources...")
-            if random.random() < 0.7:
-                res_list = list(RESOURCES.keys())
-                # Weights for: Stone, Coal, Iron Ore, Gold Ore, Emerald, Diamond, Obsidian, Mithril
-                weights = [40, 25, 15, 10, 5, 3, 1.5, 0.5]
-                res = random.choices(res_list, weights=weights)[0]
-                gc.player.inventory.append(res)
-                print(f"{Colors.GREEN}Success! You found {res}.{Colors.ENDC}")
-            else:
-                print("You found nothing but dirt.")
+            state = "on" if gc.player.auto_mining else "off"
+            times = ui.prompt(f"Dig how many times? ('auto' toggles idle mining, now {state}) (default 1): ",
+                              "mine_count").strip()
+            if times.lower() == "auto":
+                gc.toggle_auto_mining()
+                continue
+            try:
+                times = int(times) if times else 1
+            except ValueError:
+                times = 1
+            ui.line("Digging for resources...")
+            gc.mine(max(1, times))
         elif choice == '4':
             gc.save_game()
         elif choice == '5':
-            print("Farewell, adventurer!")
+            ui.line("Farewell, adventurer!")
             break
 
+def run_commands(args, store, seed: int):
+    if args.script:
+        with open(args.script) as f:
+            text = f.read()
+    else:
+        text = args.exec
+    ui = GameUI(plain=args.plain)
+    session = GameSession(args.name, args.mode, store, seed)
+    session.resume()
+    with metrics.profiling(args.profile):
+        result = run_script(session, text)
+    print_summary(ui, result)
+    ui.flush()
+
+def main(argv=None):
+    args = parse_args(argv)
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    store = SqliteSaveStore(args.db) if args.db else JsonSaveStore()
+    if args.worker:
+        serve_games(store, args.seed, args.plain)
+        return
+    if args.script or args.exec:
+        run_commands(args, store, seed)
+        return
+    gc = GameController(store, random.Random(seed))
+    gc.ui = JsonlUI(gc) if args.protocol == "jsonl" else GameUI(plain=args.plain)
+    journal = None
+    if args.journal:
+        journal = gc.ui.journal = Journal(args.journal, seed)
+        gc.store = JournalingStore(gc.store, journal)
+    if args.autosave is not None:
+        gc.ui.autosaver = Autosaver(gc.store, lambda: gc.player, args.autosave)
+    try:
+        with metrics.profiling(args.profile):
+            run_game(gc)
+    finally:
+        gc.ui.flush()
+        if gc.ui.autosaver is not None:
+            gc.ui.autosaver.close()
+        if journal:
+            journal.close(gc.player)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""Counters and timers for finding where the time goes.
+
+Nothing is measured until enable() is called. The GameController and
+Inventory hot paths are only wrapped by instrument_game(), so a normal game
+runs the original, unwrapped methods. Code that times its own phases does
+
+    with metrics.timer("driver.model"):
+        ...
+    metrics.count("driver.bytes_read", len(text))
+
+and while metrics are disabled timer() hands back a shared no-op context and
+count() returns at once.
+
+`main.py --profile` and `small_llm_play_game.py --profile` run under cProfile
+as well, print the top functions to stderr at exit and write the metrics,
+including battles per second, model latency percentiles and bytes read per
+turn, to a JSON file.
+"""
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import pstats
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+CONTROLLER_METHODS = ("battle", "attack", "auto_resolve", "flee", "end_battle", "use_item_menu", "use_item",
+                      "shop", "buy", "sell_resources", "sell", "sell_all", "mine", "save_game", "load_game")
+INVENTORY_METHODS = ("add", "remove", "count", "counts")
+
+_enabled = False
+_started = 0.0
+counters: Dict[str, int] = defaultdict(int)
+timings: Dict[str, List[float]] = defaultdict(list)
+_originals = []
+_NULL = contextlib.nullcontext()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled, _started
+    _enabled = True
+    _started = time.perf_counter()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    for cls, name, func in reversed(_originals):
+        setattr(cls, name, func)
+    _originals.clear()
+
+
+def reset():
+    counters.clear()
+    timings.clear()
+
+
+def count(name: str, n: int = 1):
+    if _enabled:
+        counters[name] += n
+
+
+def observe(name: str, seconds: float):
+    if _enabled:
+        timings[name].append(seconds)
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timings[self.name].append(time.perf_counter() - self.start)
+
+
+def timer(name: str):
+    return _Timer(name) if _enabled else _NULL
+
+
+def instrument(cls, methods, prefix: str):
+    """Replaces `cls.<method>` with a timed wrapper; disable() puts the originals back."""
+    for name in methods:
+        func = getattr(cls, name)
+
+        def make(func, key):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    timings[key].append(time.perf_counter() - start)
+            return wrapper
+
+        _originals.append((cls, name, func))
+        setattr(cls, name, make(func, f"{prefix}.{name}"))
+
+
+def instrument_game():
+    from engine import GameController
+    from models import Inventory
+
+    instrument(GameController, CONTROLLER_METHODS, "game")
+    instrument(Inventory, INVENTORY_METHODS, "inventory")
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summary() -> dict:
+    elapsed = time.perf_counter() - _started if _started else 0.0
+    timers = {
+        name: {"calls": len(v), "total_s": sum(v), "mean_ms": 1000 * sum(v) / len(v),
+               "p50_ms": 1000 * percentile(v, 0.5), "p99_ms": 1000 * percentile(v, 0.99),
+               "max_ms": 1000 * max(v)}
+        for name, v in sorted(timings.items()) if v
+    }
+    # end_battle runs once per fight that ends in a win or a death; a driver, which
+    # only sees the screens, counts those outcomes as driver.battles instead.
+    battles = len(timings.get("game.end_battle", ())) + counters.get("driver.battles", 0)
+    turns = counters.get("driver.turns", 0)
+    model = timings.get("driver.model", [])
+    return {
+        "elapsed_s": elapsed,
+        "battles_per_sec": battles / elapsed if elapsed else 0.0,
+        "model_latency_p50_ms": 1000 * percentile(model, 0.5),
+        "model_latency_p99_ms": 1000 * percentile(model, 0.99),
+        "bytes_read_per_turn": counters.get("driver.bytes_read", 0) / turns if turns else 0.0,
+        "counters": dict(counters),
+        "timers": timers,
+    }
+
+
+def write(path: str):
+    with open(path, "w") as f:
+        json.dump(summary(), f, indent=2)
+        f.write("\n")
+
+
+@contextlib.contextmanager
+def profiling(path: Optional[str], top: int = 25, instrument_methods: bool = True):
+    """With a `path`, profiles the block and writes its metrics to `path` at the end."""
+    if not path:
+        yield
+        return
+    enable()
+    if instrument_methods:
+        instrument_game()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        sys.stderr.write(out.getvalue())
+        write(path)
+        sys.stderr.write(f"Metrics written to {path}\n")
+        disable()
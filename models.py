@@ -1,5 +1,12 @@
+import json
+import os
 import random
-from typing import List, Optional
+import sys
+import time
+from collections import Counter
+from itertools import accumulate
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 class Colors:
     HEADER = '\033[95m'
@@ -12,52 +19,214 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
-class Item:
-    def __init__(self, name: str, price: int, item_type: str, bonus: int):
-        self.name = name
-        self.price = price
-        self.item_type = item_type
-        self.bonus = bonus
-
-ITEMS = {
-    "Health Potion": Item("Health Potion", 20, "heal", 30),
-    "Greater Health Potion": Item("Greater Health Potion", 60, "heal", 80),
-    "Strength Potion": Item("Strength Potion", 100, "attack_boost", 5),
-    "Iron Sword": Item("Iron Sword", 150, "attack_boost", 12),
-    "Steel Sword": Item("Steel Sword", 400, "attack_boost", 25),
-    "Diamond Sword": Item("Diamond Sword", 1000, "attack_boost", 60),
-    "Godly Sword": Item("Godly Sword", 5000, "attack_boost", 150),
-    "Wooden Axe": Item("Wooden Axe", 50, "attack_boost", 8),
-    "Iron Axe": Item("Iron Axe", 200, "attack_boost", 15),
-    "Shield": Item("Shield", 100, "defense_boost", 5),
-    "Magic Staff": Item("Magic Staff", 500, "attack_boost", 35),
-    "Enchanted Bow": Item("Enchanted Bow", 450, "attack_boost", 30),
-    "Leather Armor": Item("Leather Armor", 150, "defense_boost", 8),
-    "Chainmail Armor": Item("Chainmail Armor", 500, "defense_boost", 20),
-    "Steel Armor": Item("Steel Armor", 1200, "defense_boost", 45),
-    "Diamond Armor": Item("Diamond Armor", 3000, "defense_boost", 80),
-    "Godly Armor": Item("Godly Armor", 8000, "defense_boost", 200)
-}
-
-RESOURCES = {
-    "Stone": 2,
-    "Coal": 5,
-    "Iron Ore": 12,
-    "Gold Ore": 30,
-    "Emerald": 75,
-    "Diamond": 150,
-    "Obsidian": 300,
-    "Mithril": 750
-}
+class Item(NamedTuple):
+    """Shop item. Immutable, so the ITEMS entries are shared by every session.
+
+    `level` is the character level at which the shop starts offering it.
+    """
+    name: str
+    price: int
+    item_type: str
+    bonus: int
+    level: int = 1
+
+# Game content lives in data/*.json. Files in $RPG_CONTENT_DIR take precedence,
+# so a mod only needs to ship the files it changes.
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CONTENT_DIR = os.environ.get("RPG_CONTENT_DIR") or DATA_DIR
+
+
+def load_content(name: str, directory: str = None):
+    """Parsed `<name>.json` from `directory` (default CONTENT_DIR), else from DATA_DIR."""
+    for d in (directory or CONTENT_DIR, DATA_DIR):
+        path = os.path.join(d, f"{name}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+    raise FileNotFoundError(f"No {name}.json in {directory or CONTENT_DIR} or {DATA_DIR}")
+
+
+def parse_items(rows: List[dict]) -> Dict[str, Item]:
+    items = {}
+    for r in rows:
+        name = sys.intern(r["name"])
+        items[name] = Item(name, r["price"], sys.intern(r["type"]), r["bonus"], r.get("level", 1))
+    return items
+
+
+def parse_resources(data: dict) -> Tuple[Dict[str, int], Dict[str, float], float]:
+    """(prices, mining weights, mining success chance)."""
+    rows = data["resources"]
+    prices = {sys.intern(r["name"]): r["price"] for r in rows}
+    weights = {sys.intern(r["name"]): r["weight"] for r in rows}
+    return prices, weights, data["success_chance"]
+
+
+def parse_enemies(data: dict) -> Dict[str, List[Tuple[str, int, int, int]]]:
+    return {mode: [(sys.intern(e["name"]), e["health"], e["attack"], e["defense"]) for e in rows]
+            for mode, rows in data.items()}
+
+
+ITEMS = parse_items(load_content("items"))
+RESOURCES, MINING_WEIGHTS, MINING_SUCCESS_CHANCE = parse_resources(load_content("resources"))
+
+class ResourceSampler:
+    """Draws mining outcomes from a cumulative-weight table built once.
+
+    "Nothing but dirt" is folded into the table as a `None` outcome, so any
+    number of digs is a single random.choices call.
+    """
+
+    def __init__(self, weights: Dict[str, float], success_chance: float):
+        total = sum(weights.values())
+        probs = [w / total * success_chance for w in weights.values()]
+        self.outcomes: List[Optional[str]] = list(weights) + [None]
+        self.cum_weights = list(accumulate(probs + [1 - success_chance]))
+
+    def draw(self, times: int = 1, rng=random) -> Counter:
+        """Counts of each resource found in `times` digs (dirt is not counted)."""
+        found = Counter(rng.choices(self.outcomes, cum_weights=self.cum_weights, k=times))
+        found.pop(None, None)
+        return found
+
+MINING_SAMPLER = ResourceSampler(MINING_WEIGHTS, MINING_SUCCESS_CHANCE)
+
+# Idle mining: every interval credits AUTO_MINING_COINS plus one dig's worth of
+# resources. A miner left alone fills up after AUTO_MINING_MAX_INTERVALS (8
+# hours): one accrual credits at most that many, the rest are lost.
+# Test mode uses 1-second intervals capped at 3.
+AUTO_MINING_INTERVAL = 60.0
+AUTO_MINING_COINS = 10
+AUTO_MINING_MAX_INTERVALS = 480
+TEST_MINING_INTERVAL = 1.0
+TEST_MINING_MAX_INTERVALS = 3
+
+ENEMIES = parse_enemies(load_content("enemies"))
+
+
+class EnemyTemplate(NamedTuple):
+    """Level-1 base stats; spawn() applies the per-level scaling."""
+    name: str
+    health: int
+    attack: int
+    defense: int
+
+    def spawn(self, level: int) -> "Enemy":
+        return Enemy(self.name, self.health + level * 10, self.attack + level * 3, self.defense + level, level)
+
+
+def enemy_templates_from(enemies: Dict[str, List[tuple]]) -> Dict[str, Tuple[EnemyTemplate, ...]]:
+    return {mode: tuple(EnemyTemplate(*row) for row in rows) for mode, rows in enemies.items()}
+
+
+# Built once per mode; unknown modes fall back to the normal roster.
+ENEMY_TEMPLATES: Dict[str, Tuple[EnemyTemplate, ...]] = enemy_templates_from(ENEMIES)
+
+
+def enemy_templates(mode: str) -> Tuple[EnemyTemplate, ...]:
+    return ENEMY_TEMPLATES.get(mode) or ENEMY_TEMPLATES["normal"]
+
+
+class Inventory:
+    """Counted multiset of item names.
+
+    add/remove/count are O(1) regardless of quantity. Iterating yields one
+    entry per unit in insertion order, so code written against the old
+    List[str] inventory keeps working; use counts() to walk (name, count)
+    pairs instead. `version` goes up on every change.
+    """
+    __slots__ = ("_counts", "_size", "version")
+
+    def __init__(self, items: Iterable[str] = ()):
+        self._counts: Dict[str, int] = {}
+        self._size = 0
+        self.version = 0
+        for name in items:
+            self.add(name)
+
+    @classmethod
+    def from_counts(cls, counts: Dict[str, int]) -> "Inventory":
+        inv = cls()
+        for name, qty in counts.items():
+            inv.add(name, qty)
+        return inv
+
+    def add(self, name: str, qty: int = 1):
+        if qty <= 0:
+            return
+        self._counts[name] = self._counts.get(name, 0) + qty
+        self._size += qty
+        self.version += 1
+
+    def remove(self, name: str, qty: int = 1):
+        have = self._counts.get(name, 0)
+        if qty > have:
+            raise ValueError(f"Only {have}x {name} in inventory")
+        if qty <= 0:
+            return
+        if qty == have:
+            del self._counts[name]
+        else:
+            self._counts[name] = have - qty
+        self._size -= qty
+        self.version += 1
+
+    def count(self, name: str) -> int:
+        return self._counts.get(name, 0)
+
+    def names(self) -> List[str]:
+        return list(self._counts)
+
+    def counts(self) -> Iterable[Tuple[str, int]]:
+        return self._counts.items()
+
+    def as_list(self) -> List[str]:
+        return list(self)
+
+    # List-compatible API
+    def append(self, name: str):
+        self.add(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self._counts
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        for name, qty in self._counts.items():
+            for _ in range(qty):
+                yield name
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Inventory):
+            return self._counts == other._counts
+        if isinstance(other, list):
+            return self == Inventory(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Inventory({self._counts!r})"
 
 class Player:
+    __slots__ = ("name", "game_mode", "level", "experience", "max_health", "health", "attack", "defense",
+                 "test_mode", "clock", "mining_started", "_mining_credited", "coins", "_inventory")
+
+    # Seconds-since-epoch source for auto-mining. New players copy it into
+    # `clock`, which tests replace per instance (or here, for every player).
+    default_clock = time.time
+
     def __init__(self, name: str, game_mode: str = "normal"):
+        self.clock = Player.default_clock
         self.name = name
         self.game_mode = game_mode
         self.level = 1
         self.experience = 0
+        self.test_mode = False
+        self.mining_started: Optional[float] = None
+        self._mining_credited = 0
         self.coins = 0
-        self.inventory: List[str] = []
+        self.inventory = Inventory()
         
         if game_mode == "easy":
             self.max_health = 150
@@ -74,6 +243,94 @@ class Player:
             
         self.health = self.max_health
 
+    @property
+    def revision(self) -> tuple:
+        """Changes whenever anything that is saved does; compare with ==.
+
+        Built from the saved fields plus the inventory's change counter, so
+        checking for unsaved changes is O(1) however big the inventory is and
+        setting a stat costs nothing extra.
+        """
+        return (self.name, self.game_mode, self.level, self.experience, self.health, self.attack,
+                self.defense, self.coins, self.mining_started, self._mining_credited,
+                id(self._inventory), self._inventory.version)
+
+    @property
+    def inventory(self) -> Inventory:
+        return self._inventory
+
+    @inventory.setter
+    def inventory(self, items: Iterable[str]):
+        self._inventory = items if isinstance(items, Inventory) else Inventory(items)
+
+    @property
+    def mining_intervals(self) -> int:
+        """Auto-mining intervals credited since start_auto_mining()."""
+        return self._mining_credited
+
+    @property
+    def auto_mining(self) -> bool:
+        return self.mining_started is not None
+
+    def start_auto_mining(self, started: float = None, credited: int = 0):
+        """Starts idle mining. Nothing runs in the background: the earnings are
+        worked out from the elapsed time whenever accrue_mining() is called."""
+        self.mining_started = self.clock() if started is None else started
+        self._mining_credited = credited
+
+    def stop_auto_mining(self):
+        """Stops idle mining; accrue_mining() first to keep what it has earned."""
+        self.mining_started = None
+
+    def accrue_mining(self, rng: random.Random, intervals: int = None,
+                      sampler: ResourceSampler = MINING_SAMPLER) -> Tuple[int, Counter]:
+        """Credits the intervals completed since the last call, drawing the finds
+        from `sampler` with `rng`; returns (coins, resources) gained.
+
+        At most the cap is credited at once: the start time moves past any
+        intervals beyond it, so the miner earns again from then on. `intervals`
+        replaces the clock, for replaying a journaled accrual.
+        """
+        if self.mining_started is None:
+            return 0, Counter()
+        if self.test_mode:
+            interval, cap = TEST_MINING_INTERVAL, TEST_MINING_MAX_INTERVALS
+        else:
+            interval, cap = AUTO_MINING_INTERVAL, AUTO_MINING_MAX_INTERVALS
+        if intervals is None:
+            intervals = int(max(0.0, self.clock() - self.mining_started) // interval) - self._mining_credited
+        if intervals <= 0:
+            return 0, Counter()
+        if intervals > cap:
+            self.mining_started += (intervals - cap) * interval
+            intervals = cap
+        self._mining_credited += intervals
+        coins = intervals * AUTO_MINING_COINS
+        self.coins += coins
+        found = sampler.draw(intervals, rng)
+        for res, qty in found.items():
+            self.inventory.add(res, qty)
+        return coins, found
+
+    def use_item(self, item_name: str, items: Dict[str, Item] = ITEMS) -> bool:
+        """Consumes one `item_name` from the inventory and applies it, looking
+        it up in `items` (a ContentRegistry's catalog for modded content)."""
+        item = items.get(item_name)
+        if not item or item_name not in self.inventory:
+            return False
+        self.inventory.remove(item_name)
+        self.apply(item)
+        return True
+
+    def apply(self, item: Item):
+        """Applies the effect of one `item`, without touching the inventory."""
+        if item.item_type == "heal":
+            self.health = min(self.max_health, self.health + item.bonus)
+        elif item.item_type == "attack_boost":
+            self.attack += item.bonus
+        elif item.item_type == "defense_boost":
+            self.defense += item.bonus
+
     def level_up(self):
         self.level += 1
         self.experience = 0
@@ -90,9 +347,59 @@ class Player:
         return False
 
 class Enemy:
+    __slots__ = ("name", "health", "attack", "defense", "level")
+
     def __init__(self, name: str, health: int, attack: int, defense: int, level: int):
         self.name = name
         self.health = health
         self.attack = attack
         self.defense = defense
-        self.level = level
\ No newline at end of file
+        self.level = level
+
+class EnemyPool:
+    """Struct-of-arrays enemy storage for batch fights.
+
+    Stats live in parallel typed arrays indexed by slot, so a pool of a million
+    enemies is a handful of flat buffers rather than a million objects. Dead
+    enemies' slots are reused by later spawns.
+    """
+
+    def __init__(self, mode: str = "normal"):
+        self.templates = enemy_templates(mode)
+        self.kind = array('B')
+        self.health = array('i')
+        self.attack = array('i')
+        self.defense = array('i')
+        self.level = array('i')
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.health) - len(self._free)
+
+    def spawn(self, level: int, rng=random) -> int:
+        """Adds a random enemy of `level` and returns its slot."""
+        kind = rng.randrange(len(self.templates))
+        t = self.templates[kind]
+        stats = (kind, t.health + level * 10, t.attack + level * 3, t.defense + level, level)
+        columns = (self.kind, self.health, self.attack, self.defense, self.level)
+        if self._free:
+            slot = self._free.pop()
+            for column, value in zip(columns, stats):
+                column[slot] = value
+        else:
+            slot = len(self.health)
+            for column, value in zip(columns, stats):
+                column.append(value)
+        return slot
+
+    def spawn_many(self, level: int, n: int, rng=random) -> List[int]:
+        return [self.spawn(level, rng) for _ in range(n)]
+
+    def release(self, slot: int):
+        self.health[slot] = 0
+        self._free.append(slot)
+
+    def get(self, slot: int) -> "Enemy":
+        """A standalone Enemy copy of `slot`, for the single-fight code paths."""
+        return Enemy(self.templates[self.kind[slot]].name, self.health[slot], self.attack[slot],
+                     self.defense[slot], self.level[slot])
@@ -0,0 +1,153 @@
+"""Compacts raw game screens into terse records for the agent's history.
+
+A raw screen repeats the colored status block, health bar and full menu every
+turn. ObservationCompactor turns each screen into one line such as
+
+    [VILLAGE SHOP] hp 80/100 lvl 2 exp 50/200 coins 140(+40) atk 15 def 8
+    | You dealt 12 damage! | prompt: Choice:
+
+and only includes a menu or table when it differs from the last one it sent.
+Changed stats carry their delta in parentheses.
+trim() keeps the history under a token budget instead of a message count; a
+block whose message it drops is sent again with the next screen. Call reset()
+between games.
+"""
+import re
+from typing import Dict, List
+
+from ui import strip_ansi
+
+STATUS_PATTERNS = {
+    "hp": re.compile(r"^HP:\s+\[[#-]*\]\s*(-?\d+/\d+)"),
+    "lvl": re.compile(r"^Level:\s*(\d+)"),
+    "exp": re.compile(r"EXP:\s*(\d+/\d+)"),
+    "coins": re.compile(r"^Coins:\s*(\d+)"),
+    "atk": re.compile(r"^ATK:\s*(\d+)"),
+    "def": re.compile(r"DEF:\s*(\d+)"),
+}
+BATTLE_LINE = re.compile(r"^(.+?) HP: (-?\d+) \| .+? HP: (-?\d+)$")
+HEADER = re.compile(r"^=+ (.+?) =+$")
+MENU_LINE = re.compile(r"^([0-9A-Za-z])\.\s+(.+)$")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+class ObservationCompactor:
+    def __init__(self):
+        self.raw_tokens = 0
+        self.compact_tokens = 0
+        self._stats: Dict[str, str] = {}
+        self._last_blocks: Dict[str, str] = {}
+        self._block_records: Dict[str, str] = {}   # block name -> the record that last carried it
+
+    def reset(self):
+        """Forgets the stats and blocks already sent, for a new game; keeps the token totals."""
+        self._stats.clear()
+        self._last_blocks.clear()
+        self._block_records.clear()
+
+    def compact(self, screen: str) -> str:
+        text = strip_ansi(screen)
+        stats: Dict[str, str] = {}
+        menu: List[str] = []
+        table: List[str] = []
+        events: List[str] = []
+        header = enemy = None
+
+        lines = text.split("\n")
+        prompt = lines.pop().strip() if lines and not text.endswith("\n") else ""
+        for raw in lines:
+            line = raw.strip()
+            if not line or set(line) <= set("-=") or (line.startswith("---") and line.endswith("---")):
+                continue
+            matched = False
+            for key, pattern in STATUS_PATTERNS.items():
+                m = pattern.search(line)
+                if m:
+                    stats[key] = m.group(1)
+                    matched = True
+            if matched:
+                continue
+            if HEADER.match(line):
+                header = HEADER.match(line).group(1)
+            elif BATTLE_LINE.match(line):
+                m = BATTLE_LINE.match(line)
+                enemy = f"vs {m.group(1)} {m.group(2)}"
+                max_hp = self._stats.get("hp", "").partition("/")[2]
+                stats["hp"] = f"{m.group(3)}/{max_hp}" if max_hp else m.group(3)
+            elif " | " in line:
+                table.append("|".join(part.strip() for part in line.split("|")))
+            elif MENU_LINE.match(line):
+                menu.append("{} {}".format(*MENU_LINE.match(line).groups()))
+            elif line != "What will you do?":
+                events.append(line)
+
+        parts = []
+        state = self._state_record(stats)
+        head = f"[{header}] " if header else ""
+        if head or state:
+            parts.append((head + state).strip())
+        if enemy:
+            parts.append(enemy)
+        parts.extend(events)
+        sent = []
+        for name, block in (("table", table), ("menu", menu)):
+            block_text = "; ".join(block)
+            if block_text and block_text != self._last_blocks.get(name):
+                parts.append(f"{name}: {block_text}")
+                self._last_blocks[name] = block_text
+                sent.append(name)
+        if prompt:
+            parts.append(f"prompt: {prompt}")
+
+        record = " | ".join(parts)
+        for name in sent:
+            self._block_records[name] = record
+        self.raw_tokens += estimate_tokens(screen)
+        self.compact_tokens += estimate_tokens(record)
+        return record
+
+    def _state_record(self, stats: Dict[str, str]) -> str:
+        fields = []
+        for key, value in stats.items():
+            before = self._stats.get(key)
+            change = ""
+            if before is not None and before != value:
+                diff = int(value.partition("/")[0]) - int(before.partition("/")[0])
+                change = f"({diff:+d})" if diff else ""
+            fields.append(f"{key} {value}{change}")
+        self._stats.update(stats)
+        return " ".join(fields)
+
+    def trim(self, history: List[dict], budget: int) -> List[dict]:
+        """Keeps the newest messages that fit in `budget` tokens (always at least one).
+
+        A menu or table whose only copy is trimmed away is forgotten, so the
+        next record carries it again.
+        """
+        kept, used = [], 0
+        for message in reversed(history):
+            cost = estimate_tokens(message["content"])
+            if kept and used + cost > budget:
+                break
+            kept.append(message)
+            used += cost
+        if len(kept) < len(history):
+            contents = {message["content"] for message in kept}
+            for name, record in list(self._block_records.items()):
+                if record not in contents:
+                    del self._block_records[name]
+                    self._last_blocks.pop(name, None)
+        return kept[::-1]
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.raw_tokens - self.compact_tokens
+
+    def report(self) -> str:
+        ratio = self.compact_tokens / self.raw_tokens if self.raw_tokens else 1.0
+        return (f"Observation compaction: {self.raw_tokens} -> {self.compact_tokens} tokens "
+                f"({self.tokens_saved} saved, {1 - ratio:.0%})")
@@ -0,0 +1,76 @@
+"""JSON-lines front end for drivers and bots (`main.py --protocol jsonl`).
+
+Every time the game waits for input it writes exactly one JSON object on one
+line:
+
+    {"type": "prompt", "prompt_id": "main_menu", "prompt": "> ",
+     "options": {"1": "Explore the Wilds", ...}, "screen": "...",
+     "player": {...}, "enemy": {...} or null}
+
+and reads exactly one line back, either a JSON object `{"input": "1"}`, a JSON
+string `"1"` or the bare reply. When the game ends, any remaining text is sent
+as a final `{"type": "end", ...}` object.
+"""
+import json
+import sys
+from typing import Optional
+from models import Player, Enemy
+from ui import GameUI
+
+
+def player_state(player: Optional[Player]) -> Optional[dict]:
+    if player is None:
+        return None
+    return {
+        "name": player.name, "mode": player.game_mode,
+        "level": player.level, "experience": player.experience, "next_level": player.level * 100,
+        "coins": player.coins, "health": player.health, "max_health": player.max_health,
+        "attack": player.attack, "defense": player.defense,
+        "inventory": dict(player.inventory.counts())
+    }
+
+
+def enemy_state(enemy: Optional[Enemy]) -> Optional[dict]:
+    if enemy is None:
+        return None
+    return {"name": enemy.name, "health": enemy.health, "attack": enemy.attack,
+            "defense": enemy.defense, "level": enemy.level}
+
+
+def parse_reply(line: str) -> str:
+    line = line.rstrip("\n")
+    try:
+        reply = json.loads(line)
+    except ValueError:
+        return line
+    if isinstance(reply, dict):
+        return str(reply.get("input", ""))
+    return str(reply)
+
+
+class JsonlUI(GameUI):
+    def __init__(self, gc, stream=None, stdin=None):
+        super().__init__(stream, plain=True)
+        self.gc = gc
+        self.stdin = stdin or sys.stdin
+
+    def _emit(self, msg: dict):
+        msg["screen"] = self.take()
+        msg["player"] = player_state(self.gc.player)
+        msg["enemy"] = enemy_state(self.gc.enemy)
+        self.stream.write(json.dumps(msg) + "\n")
+        self.stream.flush()
+
+    def ask(self, text: str, prompt_id: str = None, options: dict = None) -> str:
+        self._emit({"type": "prompt", "prompt_id": prompt_id, "prompt": text, "options": options or {}})
+        line = self.stdin.readline()
+        if not line:
+            raise EOFError
+        return parse_reply(line)
+
+    def flush(self):
+        if self._buffer:
+            self._emit({"type": "end"})
+
+    def clear(self):
+        self._buffer.clear()
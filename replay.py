@@ -0,0 +1,221 @@
+"""Session journals and a headless replay engine.
+
+A game started with `main.py --journal PATH` (optionally `--seed N`) appends
+JSON lines to PATH:
+
+    {"type": "start", "seed": 1234, "version": 1}
+    {"type": "input", "prompt_id": "main_menu", "reply": "1"}
+    {"type": "load", "name": "Hero", "data": {...}}       # a save that was loaded
+    {"type": "mining", "intervals": 3}                    # idle-mining intervals credited
+    {"type": "end", "final": {...}}                       # player state at exit
+
+Because every random draw comes from the seeded GameController.rng and every
+reply is journaled, replaying the inputs against the same seed reproduces the
+session exactly. Idle mining depends on the wall clock, so its accruals are
+journaled too and replayed by count. `python replay.py journals/*.jsonl` re-runs each one
+headlessly and checks it reaches the recorded final state. A journal that was
+appended to by several runs is replayed one session at a time.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from engine import GameController
+from models import Player
+from protocol import player_state
+from saves import player_from_dict, player_to_dict
+from ui import NullUI
+
+JOURNAL_VERSION = 1
+
+
+class Journal:
+    def __init__(self, path: str, seed: int):
+        self.path = path
+        self.seed = seed
+        # Line-buffered: every record reaches the file as it is written, so a
+        # crash, when a replay is most wanted, loses nothing.
+        self._file = open(path, "a", buffering=1)
+        self._append({"type": "start", "seed": seed, "version": JOURNAL_VERSION})
+
+    def _append(self, record: dict):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def record_input(self, prompt_id: Optional[str], reply: str):
+        self._append({"type": "input", "prompt_id": prompt_id, "reply": reply})
+
+    def record_mining(self, intervals: int):
+        self._append({"type": "mining", "intervals": intervals})
+
+    def record_load(self, name: str, player: Optional[Player]):
+        self._append({"type": "load", "name": name, "data": player_to_dict(player) if player else None})
+
+    def close(self, player: Optional[Player]):
+        if not self._file.closed:
+            self._append({"type": "end", "final": player_state(player)})
+            self._file.close()
+
+
+class JournalingStore:
+    """Wraps a save store so loaded characters are captured in the journal."""
+
+    def __init__(self, store, journal: Journal):
+        self.store = store
+        self.journal = journal
+
+    def save(self, player: Player):
+        self.store.save(player)
+
+    def save_dict(self, data: dict):
+        self.store.save_dict(data)
+
+    def load(self, name: str) -> Optional[Player]:
+        player = self.store.load(name)
+        self.journal.record_load(name, player)
+        return player
+
+    def list_characters(self) -> List[dict]:
+        return self.store.list_characters()
+
+
+class ReplayStore:
+    """Serves the journaled loads back in order; saves are discarded."""
+
+    def __init__(self, loads: List[Optional[dict]]):
+        self.loads = list(loads)
+
+    def save(self, player: Player):
+        pass
+
+    def save_dict(self, data: dict):
+        pass
+
+    def load(self, name: str) -> Optional[Player]:
+        data = self.loads.pop(0)
+        return player_from_dict(data) if data else None
+
+    def list_characters(self) -> List[dict]:
+        return []
+
+
+class ScriptedUI(NullUI):
+    """Answers prompts from a fixed list of replies; EOFError when they run out."""
+
+    def __init__(self, replies: List[str]):
+        super().__init__()
+        self.replies = replies
+        self.position = 0
+
+    def ask(self, text: str, prompt_id: str = None, options: dict = None) -> str:
+        if self.position >= len(self.replies):
+            raise EOFError
+        reply = self.replies[self.position]
+        self.position += 1
+        return reply
+
+
+class ReplayController(GameController):
+    """Credits idle mining from the journal: (replies consumed, intervals) pairs, in order."""
+
+    def __init__(self, store, rng: random.Random, mining: List[Tuple[int, int]]):
+        super().__init__(store, rng)
+        self.mining = list(mining)
+
+    def mining_due(self) -> Optional[int]:
+        if self.mining and self.mining[0][0] == self.ui.position:
+            return self.mining.pop(0)[1]
+        return 0
+
+
+def read_journal(path: str) -> List[tuple]:
+    """Returns (seed, replies, loads, mining, final state or None) for each session in
+    a journal file; --journal appends, so one file can hold several, each opened by
+    its own start record.
+
+    `mining` pairs each journaled accrual with the number of replies before it.
+    """
+    sessions = []
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            kind = record["type"]
+            if kind == "start":
+                replies, loads, mining = [], [], []
+                sessions.append([record["seed"], replies, loads, mining, None])
+            elif not sessions:
+                raise ValueError(f"{path} does not begin with a start record")
+            elif kind == "input":
+                replies.append(record["reply"])
+            elif kind == "load":
+                loads.append(record["data"])
+            elif kind == "mining":
+                mining.append((len(replies), record["intervals"]))
+            elif kind == "end":
+                sessions[-1][4] = record["final"]
+    if not sessions:
+        raise ValueError(f"{path} has no start record")
+    return [tuple(session) for session in sessions]
+
+
+def replay_session(seed: int, replies: List[str], loads: List[Optional[dict]], mining: List[Tuple[int, int]],
+                   final: Optional[dict]) -> dict:
+    """Re-runs one journaled session headlessly and compares the outcome with its recorded end state."""
+    from main import run_game
+
+    gc = ReplayController(ReplayStore(loads), random.Random(seed), mining)
+    gc.ui = ScriptedUI(replies)
+    try:
+        run_game(gc)
+    except EOFError:
+        pass
+    state = player_state(gc.player)
+    return {
+        "seed": seed,
+        "inputs": len(replies),
+        "consumed": gc.ui.position,
+        "final": state,
+        "matches": final is not None and state == final and gc.ui.position == len(replies)
+    }
+
+
+def replay(path: str) -> dict:
+    """Replays every session in a journal; it matches if each of them does."""
+    sessions = [replay_session(*session) for session in read_journal(path)]
+    return {
+        "path": path,
+        "sessions": sessions,
+        "inputs": sum(s["inputs"] for s in sessions),
+        "consumed": sum(s["consumed"] for s in sessions),
+        "final": sessions[-1]["final"],
+        "matches": all(s["matches"] for s in sessions)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay session journals and verify their final state.")
+    parser.add_argument("journals", nargs="+")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    failures = 0
+    inputs = sessions = 0
+    for path in args.journals:
+        result = replay(path)
+        inputs += result["inputs"]
+        sessions += len(result["sessions"])
+        for n, session in enumerate(result["sessions"], 1):
+            if not session["matches"]:
+                failures += 1
+                print(f"MISMATCH {path} session {n}: replayed {session['consumed']}/{session['inputs']} inputs, "
+                      f"final {session['final']}")
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {sessions} sessions from {len(args.journals)} journals ({inputs} inputs) in {elapsed:.2f}s; "
+          f"{failures} mismatched")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
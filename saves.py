@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import List, Optional
+from models import Player, Inventory
+
+# Version 1 saves (no "version" key) stored the inventory as one string per unit.
+# Version 2 stores it as {item: count}, plus an optional "mining" entry
+# [start timestamp, intervals credited] while auto-mining is running.
+SAVE_VERSION = 2
+
+# Names become file names in JsonSaveStore and arrive from remote clients on
+# the server, so they are limited to letters, digits, spaces, ' and -: no path
+# separators, no dots, and nothing that could name a file outside the store.
+NAME_PATTERN = re.compile(r"[^\W_][\w '-]{0,31}")
+
+
+def valid_name(name: str) -> bool:
+    return NAME_PATTERN.fullmatch(name) is not None
+
+
+def player_to_dict(player: Player) -> dict:
+    return {
+        "version": SAVE_VERSION,
+        "name": player.name, "mode": player.game_mode,
+        "lvl": player.level, "exp": player.experience,
+        "coins": player.coins, "inv": dict(player.inventory.counts()),
+        "hp": player.health, "atk": player.attack, "def": player.defense,
+        "mining": [player.mining_started, player._mining_credited] if player.auto_mining else None
+    }
+
+
+def player_from_dict(d: dict) -> Player:
+    player = Player(d['name'], d['mode'])
+    player.level, player.experience = d['lvl'], d['exp']
+    player.coins = d['coins']
+    if d.get('version', 1) < 2:
+        player.inventory = Inventory(d['inv'])
+    else:
+        player.inventory = Inventory.from_counts(d['inv'])
+    player.health, player.attack, player.defense = d['hp'], d['atk'], d['def']
+    if d.get('mining'):
+        player.start_auto_mining(*d['mining'])
+    return player
+
+
+def write_atomic(path: str, text: str):
+    """Write `text` to a temp file next to `path`, then rename it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# A save store is anything with save(player), load(name) -> Optional[Player]
+# and list_characters() -> List[dict]; GameController only relies on these.
+# save_dict(data) writes an already-taken player_to_dict() snapshot, which is
+# what autosave.AutosaveWriter calls from its own thread.
+
+class JsonSaveStore:
+    """One `<name>_save.json` file per character in `directory`."""
+
+    def __init__(self, directory: str = "."):
+        self.directory = directory
+
+    def path(self, name: str) -> str:
+        if not valid_name(name):
+            raise ValueError(f"Invalid character name {name!r}")
+        return os.path.join(self.directory, f"{name}_save.json")
+
+    def save(self, player: Player):
+        self.save_dict(player_to_dict(player))
+
+    def save_dict(self, data: dict):
+        write_atomic(self.path(data["name"]), json.dumps(data, separators=(',', ':')))
+
+    def load(self, name: str) -> Optional[Player]:
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            d = json.load(f)
+        player = player_from_dict(d)
+        if d.get('version', 1) < SAVE_VERSION:
+            self.save(player)
+        return player
+
+    def list_characters(self) -> List[dict]:
+        suffix = "_save.json"
+        return [{"name": f[:-len(suffix)]} for f in sorted(os.listdir(self.directory)) if f.endswith(suffix)]
+
+
+class SqliteSaveStore:
+    """All characters in one SQLite database, indexed for listing and leaderboards.
+
+    Safe to share between game processes: the database runs in WAL mode and
+    every save is a single IMMEDIATE transaction, so concurrent writers queue
+    on the lock (up to `timeout` seconds) instead of corrupting each other.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS characters (
+            name TEXT PRIMARY KEY,
+            mode TEXT NOT NULL,
+            level INTEGER NOT NULL,
+            coins INTEGER NOT NULL,
+            last_played REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_characters_level ON characters(level);
+        CREATE INDEX IF NOT EXISTS idx_characters_coins ON characters(coins);
+        CREATE INDEX IF NOT EXISTS idx_characters_last_played ON characters(last_played);
+    """
+    RANK_COLUMNS = ("level", "coins")
+
+    def __init__(self, path: str = "saves.db", timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not cross threads, so keep one per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def save(self, player: Player):
+        self.save_dict(player_to_dict(player))
+
+    def save_dict(self, data: dict):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO characters (name, mode, level, coins, last_played, data) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET mode=excluded.mode, level=excluded.level, "
+                "coins=excluded.coins, last_played=excluded.last_played, data=excluded.data",
+                (data["name"], data["mode"], data["lvl"], data["coins"], time.time(),
+                 json.dumps(data, separators=(',', ':'))))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load(self, name: str) -> Optional[Player]:
+        row = self._conn().execute("SELECT data FROM characters WHERE name = ?", (name,)).fetchone()
+        return player_from_dict(json.loads(row["data"])) if row else None
+
+    def delete(self, name: str):
+        self._conn().execute("DELETE FROM characters WHERE name = ?", (name,))
+
+    def _summaries(self, order_by: str, limit: Optional[int]) -> List[dict]:
+        sql = f"SELECT name, mode, level, coins, last_played FROM characters ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self._conn().execute(sql)]
+
+    def list_characters(self) -> List[dict]:
+        return self._summaries("name", None)
+
+    def top(self, by: str = "level", n: int = 10) -> List[dict]:
+        if by not in self.RANK_COLUMNS:
+            raise ValueError(f"Can only rank by {', '.join(self.RANK_COLUMNS)}")
+        return self._summaries(f"{by} DESC, name", n)
+
+    def last_played(self, n: int = 10) -> List[dict]:
+        return self._summaries("last_played DESC", n)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a SQLite save database.")
+    parser.add_argument("--db", default="saves.db")
+    parser.add_argument("query", choices=["list", "top", "recent"])
+    parser.add_argument("--by", default="level", choices=SqliteSaveStore.RANK_COLUMNS)
+    parser.add_argument("-n", type=int, default=10)
+    args = parser.parse_args()
+
+    store = SqliteSaveStore(args.db)
+    if args.query == "list":
+        rows = store.list_characters()
+    elif args.query == "top":
+        rows = store.top(args.by, args.n)
+    else:
+        rows = store.last_played(args.n)
+    for r in rows:
+        played = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["last_played"]))
+        print(f"{r['name']:<20} {r['mode']:<9} lvl {r['level']:<4} {r['coins']:>10} coins  {played}")
+
+
+if __name__ == "__main__":
+    main()
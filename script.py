@@ -0,0 +1,108 @@
+"""Runs a list of game commands without drawing the screens in between.
+
+    python main.py --name Miner --exec 'mine 500; sell all; buy "Health Potion" 20; save'
+    python main.py --name Miner --script grind.txt
+
+Commands are the GameSession actions (see session.py), separated by ';' or
+newlines; '#' starts a comment. `N x <command>` repeats a command N times.
+The character is loaded from its save if it has one. Nothing is printed until
+the end, when one summary shows what changed.
+"""
+import re
+import time
+from typing import List, Tuple
+
+from models import Colors
+from protocol import player_state
+from session import GameSession
+
+REPEAT = re.compile(r"^(\d+)\s*x\s+(.+)$")
+
+
+def split_commands(text: str) -> List[Tuple[int, str]]:
+    """(line number, command) pairs; ';' inside quotes does not split."""
+    commands = []
+    for number, line in enumerate(text.splitlines(), 1):
+        current, quote = [], None
+        for ch in line:
+            if quote:
+                quote = None if ch == quote else quote
+            elif ch in "\"'":
+                quote = ch
+            elif ch == "#":
+                break
+            elif ch == ";":
+                commands.append((number, "".join(current).strip()))
+                current = []
+                continue
+            current.append(ch)
+        commands.append((number, "".join(current).strip()))
+    return [(number, command) for number, command in commands if command]
+
+
+def expand(commands: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    expanded = []
+    for number, command in commands:
+        m = REPEAT.match(command)
+        if m:
+            expanded.extend([(number, m.group(2))] * int(m.group(1)))
+        else:
+            expanded.append((number, command))
+    return expanded
+
+
+def run_script(session: GameSession, text: str) -> dict:
+    """Runs every command in `text` against the session's current character."""
+    commands = expand(split_commands(text))
+    before = player_state(session.player)
+    errors, rewards = [], {"won": 0, "lost": 0}
+    executed = 0
+    start = time.perf_counter()
+    for number, command in commands:
+        if session.done:
+            break
+        obs, reward, done = session.step(command)
+        executed += 1
+        if obs["error"]:
+            errors.append((number, command, obs["error"]))
+        if reward > 0:
+            rewards["won"] += 1
+        elif reward < 0:
+            rewards["lost"] += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "commands": len(commands), "executed": executed, "elapsed": elapsed,
+        "battles_won": rewards["won"], "died": rewards["lost"] > 0,
+        "in_battle": session.phase == "battle", "errors": errors,
+        "before": before, "after": player_state(session.player)
+    }
+
+
+def print_summary(ui, result: dict):
+    before, after = result["before"], result["after"]
+    ui.print_header("SCRIPT SUMMARY")
+    rate = result["executed"] / result["elapsed"] if result["elapsed"] else 0
+    ui.line(f"Ran {result['executed']}/{result['commands']} commands in {result['elapsed'] * 1000:.1f} ms "
+            f"({rate:,.0f}/s)")
+    for label, key in (("Level", "level"), ("Coins", "coins"), ("HP", "health"),
+                       ("ATK", "attack"), ("DEF", "defense")):
+        change = after[key] - before[key]
+        ui.line(f"{label + ':':<7}{before[key]} -> {after[key]}" + (f" ({change:+d})" if change else ""))
+    if result["battles_won"]:
+        ui.line(f"Battles won: {result['battles_won']}")
+    changed = sorted(set(before["inventory"]) | set(after["inventory"]))
+    rows = [(name, before["inventory"].get(name, 0), after["inventory"].get(name, 0)) for name in changed]
+    rows = [row for row in rows if row[1] != row[2]]
+    if rows:
+        ui.print_table_row(["Item", "Before", "After"], [22, 8, 8])
+        ui.line("-" * 42)
+        for name, old, new in rows:
+            ui.print_table_row([name, old, new], [22, 8, 8])
+    if result["died"]:
+        ui.line(f"{Colors.FAIL}The character died; the remaining commands were skipped.{Colors.ENDC}")
+    elif result["in_battle"]:
+        ui.line(f"{Colors.WARNING}The script ended in the middle of a battle.{Colors.ENDC}")
+    for number, command, error in result["errors"][:10]:
+        ui.line(f"{Colors.FAIL}line {number}: {command!r}: {error}{Colors.ENDC}")
+    if len(result["errors"]) > 10:
+        ui.line(f"... and {len(result['errors']) - 10} more errors")
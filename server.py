@@ -0,0 +1,305 @@
+"""Hosts many players in one process over TCP (telnet or netcat).
+
+    python server.py --port 4000 --db saves.db
+    telnet localhost 4000
+
+Each connection gets its own GameController whose UI is a SessionIO: screens
+are handed to the connection's asyncio writer and replies come back through a
+queue, so the unchanged game loop (main.run_game) runs in a lightweight
+per-session thread while one event loop does all the socket I/O.
+
+With --autosave SECONDS every session's changes are also saved in the
+background by one shared writer thread (see autosave.py).
+
+A session that waits longer than --idle seconds for input is evicted: the
+character is saved to the store and the connection closed; the player resumes
+with "Continue previous adventure? y". Output is drained before the game may
+continue, and a client that types ahead more than --max-pending lines stops
+being read until the game catches up, so a slow or flooding client only
+holds back its own session.
+
+`python server.py --load-test 500` starts a server and drives 500 scripted
+clients against it, then prints throughput and turn latency.
+"""
+import argparse
+import asyncio
+import queue
+import random
+import statistics
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Dict, Optional
+
+from autosave import Autosaver, AutosaveWriter
+from engine import GameController
+from saves import JsonSaveStore, SqliteSaveStore
+from ui import GameUI
+
+SESSION_STACK_SIZE = 256 * 1024
+WRITE_BUFFER_HIGH = 64 * 1024
+
+
+class SessionClosed(Exception):
+    """The client disconnected."""
+
+
+class SessionIdle(Exception):
+    """No input arrived within the idle timeout."""
+
+
+class SessionIO(GameUI):
+    """GameUI for one connection; called from the session's thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter,
+                 idle_timeout: float, max_pending: int, plain: bool = False):
+        super().__init__(stream=None, plain=plain)
+        self.loop = loop
+        self.writer = writer
+        self.idle_timeout = idle_timeout
+        self.max_pending = max_pending
+        self.inbox: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.room = asyncio.Event()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        text = self.take().replace("\n", "\r\n")
+        future = asyncio.run_coroutine_threadsafe(self._send(text.encode()), self.loop)
+        try:
+            future.result()
+        except (ConnectionError, RuntimeError) as e:
+            raise SessionClosed() from e
+
+    async def _send(self, data: bytes):
+        self.writer.write(data)
+        await self.writer.drain()
+
+    def ask(self, text: str, prompt_id: str = None, options: dict = None) -> str:
+        self.write(text)
+        self.flush()
+        try:
+            reply = self.inbox.get(timeout=self.idle_timeout)
+        except queue.Empty:
+            raise SessionIdle()
+        self.loop.call_soon_threadsafe(self.room.set)
+        if reply is None:
+            raise SessionClosed()
+        return reply
+
+    async def feed(self, reader: asyncio.StreamReader):
+        """Moves lines from the socket to the inbox, pausing while too many are pending."""
+        try:
+            while True:
+                while self.inbox.qsize() >= self.max_pending:
+                    self.room.clear()
+                    await self.room.wait()
+                line = await reader.readline()
+                if not line:
+                    break
+                self.inbox.put(line.decode(errors="replace").rstrip("\r\n"))
+        except ConnectionError:
+            pass
+        finally:
+            self.inbox.put(None)
+
+
+class GameServer:
+    def __init__(self, store=None, idle_timeout: float = 300.0, max_sessions: int = 5000,
+                 max_pending: int = 16, seed: int = None, autosave: float = None, plain: bool = False):
+        self.store = store or JsonSaveStore()
+        self.autosave = autosave
+        self.autosave_writer = AutosaveWriter() if autosave is not None else None
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending
+        self.plain = plain
+        self.seeds = random.Random(seed)
+        self.sessions: Dict[int, GameController] = {}
+        self.stats = {"connections": 0, "refused": 0, "evicted": 0, "finished": 0, "disconnected": 0,
+                      "crashed": 0}
+        self._next_id = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self.sessions) >= self.max_sessions:
+            self.stats["refused"] += 1
+            writer.write(b"Server full, try again later.\r\n")
+            await writer.drain()
+            writer.close()
+            return
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        self.stats["connections"] += 1
+        session_id = self._next_id
+        self._next_id += 1
+
+        gc = GameController(self.store, random.Random(self.seeds.getrandbits(64)))
+        io = gc.ui = SessionIO(asyncio.get_running_loop(), writer, self.idle_timeout, self.max_pending, self.plain)
+        if self.autosave is not None:
+            io.autosaver = Autosaver(self.store, lambda: gc.player, self.autosave, self.autosave_writer)
+        self.sessions[session_id] = gc
+        feeder = asyncio.create_task(io.feed(reader))
+        try:
+            outcome = await self._in_thread(gc)
+            self.stats[outcome] += 1
+        except Exception:
+            self.stats["crashed"] += 1
+            traceback.print_exc()
+            writer.write(b"\r\nThe game hit an internal error; disconnecting.\r\n")
+        finally:
+            feeder.cancel()
+            del self.sessions[session_id]
+            writer.close()
+
+    async def _in_thread(self, gc: GameController) -> str:
+        # A dedicated thread per session rather than the default executor, whose
+        # small worker pool would cap the number of concurrent players.
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def target():
+            try:
+                outcome = self._play(gc)
+            except Exception as e:
+                loop.call_soon_threadsafe(done.set_exception, e)
+            else:
+                loop.call_soon_threadsafe(done.set_result, outcome)
+
+        threading.Thread(target=target, daemon=True, name="session").start()
+        return await done
+
+    def _play(self, gc: GameController) -> str:
+        from main import run_game
+
+        try:
+            run_game(gc)
+            gc.ui.flush()
+            if gc.ui.autosaver is not None:
+                gc.ui.autosaver.flush()
+            return "finished"
+        except SessionIdle:
+            self._evict(gc)
+            try:
+                gc.ui.line("\nIdle for too long; your progress was saved. Goodbye!")
+                gc.ui.flush()
+            except SessionClosed:
+                pass
+            return "evicted"
+        except SessionClosed:
+            self._evict(gc)
+            return "disconnected"
+
+    def _evict(self, gc: GameController):
+        if gc.ui.autosaver is not None:
+            gc.ui.autosaver.flush()
+        elif gc.player is not None and gc.player.health > 0:
+            self.store.save(gc.player)
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        # A deep accept backlog: asyncio's default of 100 drops connections when
+        # many players connect at once.
+        return await asyncio.start_server(self.handle, host, port, limit=4096,
+                                          backlog=max(100, min(self.max_sessions, 4096)))
+
+
+async def play_client(host: str, port: int, script, timeout: float = 30.0):
+    """Plays `script` (a list of replies) as one client; returns per-turn latencies."""
+    reader, writer = await asyncio.open_connection(host, port)
+    latencies = []
+
+    async def read_screen() -> str:
+        data = b""
+        while True:
+            chunk = await asyncio.wait_for(reader.read(65536), timeout)
+            if not chunk:
+                return data.decode(errors="replace")
+            data += chunk
+            # Every screen ends with its prompt, which has no trailing newline.
+            if not data.endswith(b"\n"):
+                return data.decode(errors="replace")
+
+    try:
+        await read_screen()
+        for reply in script:
+            start = time.perf_counter()
+            writer.write(reply.encode() + b"\r\n")
+            await writer.drain()
+            screen = await read_screen()
+            latencies.append(time.perf_counter() - start)
+            if not screen:
+                break
+    finally:
+        writer.close()
+    return latencies
+
+
+def client_script(i: int, turns: int):
+    script = ["n", f"Load{i}", "normal"]
+    for t in range(turns):
+        script += ["3", "10"] if t % 4 else ["2", "S", "A"]
+    return script + ["5"]
+
+
+async def load_test(clients: int, turns: int, store, idle_timeout: float):
+    server = GameServer(store, idle_timeout=idle_timeout, max_sessions=clients + 1, seed=0, plain=True)
+    tcp = await server.serve("127.0.0.1", 0)
+    port = tcp.sockets[0].getsockname()[1]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play_client("127.0.0.1", port, client_script(i, turns))
+                                     for i in range(clients)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    tcp.close()
+    await tcp.wait_closed()
+
+    latencies = sorted(x for r in results if isinstance(r, list) for x in r)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    print(f"{clients} clients, {len(latencies)} turns in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:,.0f} turns/s), {len(errors)} errors")
+    if latencies:
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"turn latency: p50 {statistics.median(latencies) * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms")
+    if errors:
+        kinds = Counter(type(e).__name__ for e in errors)
+        print("client errors: " + ", ".join(f"{n} {kind}" for kind, n in kinds.most_common()))
+    print(f"server: {server.stats}")
+    return server.stats, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many players in one process over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--db", help="SQLite save database (default: JSON files in the current directory)")
+    parser.add_argument("--idle", type=float, default=300.0, help="seconds without input before a session is saved and closed")
+    parser.add_argument("--max-sessions", type=int, default=5000)
+    parser.add_argument("--max-pending", type=int, default=16, help="typed-ahead lines buffered per session")
+    parser.add_argument("--plain", action="store_true", help="no ANSI colors")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--autosave", type=float, metavar="SECONDS", help="save each session's changes in the background")
+    parser.add_argument("--load-test", type=int, metavar="CLIENTS", help="run scripted clients against a local server")
+    parser.add_argument("--turns", type=int, default=50, help="menu actions per load-test client")
+    args = parser.parse_args()
+
+    threading.stack_size(SESSION_STACK_SIZE)
+    store = SqliteSaveStore(args.db) if args.db else JsonSaveStore()
+
+    if args.load_test:
+        asyncio.run(load_test(args.load_test, args.turns, store, args.idle))
+        return
+
+    async def run():
+        server = GameServer(store, args.idle, args.max_sessions, args.max_pending, args.seed, args.autosave,
+                            args.plain)
+        tcp = await server.serve(args.host, args.port)
+        print(f"Serving on {args.host}:{args.port}")
+        async with tcp:
+            await tcp.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
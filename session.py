@@ -0,0 +1,205 @@
+"""In-process game sessions for agents and batch evaluation.
+
+A GameSession plays the same game as main.py through the GameController
+primitives, but is driven by step(action) calls instead of stdin/stdout:
+
+    session = GameSession("Agent", "normal")
+    obs = session.reset()
+    obs, reward, done = session.step("explore")
+    obs, reward, done = session.step("attack")
+
+Actions are short commands; names may be quoted and a trailing number is a
+quantity: explore, mine [n], buy <item> [qty], sell all, sell <resource> [qty],
+use <item>, recommend [win|attack|defense], save, quit in the menu and attack, auto, run, use <item> in
+battle, where auto fights to the end without per-round output and recommend
+buys and uses the planner's best bundle (see planner.py).
+Winning a battle is worth +1 reward and dying -1; everything else is 0.
+"""
+import random
+import shlex
+from typing import List, Optional, Tuple
+
+from engine import GameController
+from models import Player
+from planner import OBJECTIVES, plan
+from protocol import player_state, enemy_state
+from solver import solve
+from ui import NullUI
+
+MENU_ACTIONS = ["explore", "mine", "buy", "sell", "use", "recommend", "save", "quit"]
+BATTLE_ACTIONS = ["attack", "auto", "run", "use"]
+
+
+def parse_action(text: str) -> Tuple[str, Optional[str], int]:
+    """Splits 'buy "Health Potion" 3' (quotes optional) into (verb, target, qty)."""
+    try:
+        words = shlex.split(text)
+    except ValueError:
+        words = text.split()
+    if not words:
+        return "", None, 1
+    verb, rest = words[0].lower(), words[1:]
+    qty = 1
+    if rest and rest[-1].isdigit():
+        qty = int(rest.pop())
+    return verb, " ".join(rest) or None, qty
+
+
+def _lookup(name: Optional[str], table: dict) -> Optional[str]:
+    """Case-insensitive match of `name` against the keys of `table`."""
+    if name is None:
+        return None
+    if name in table:
+        return name
+    lowered = name.lower()
+    return next((key for key in table if key.lower() == lowered), name)
+
+
+class GameSession:
+    def __init__(self, name: str = "Agent", mode: str = "normal", store=None, seed: int = None):
+        self.name = name
+        self.mode = mode
+        self.gc = GameController(store, random.Random(seed))
+        self.gc.ui = NullUI()
+        self.done = True
+        self.turns = 0
+
+    @property
+    def player(self) -> Player:
+        return self.gc.player
+
+    @property
+    def phase(self) -> str:
+        if self.done:
+            return "over"
+        return "battle" if self.gc.enemy else "menu"
+
+    def reset(self, name: str = None, mode: str = None) -> dict:
+        self.gc.player = Player(name or self.name, mode or self.mode)
+        self.gc.enemy = None
+        self.done = False
+        self.turns = 0
+        return self.observation()
+
+    def resume(self, name: str = None, mode: str = None) -> dict:
+        """Continues the saved character `name`, or starts it afresh if it has no save."""
+        player = self.gc.store.load(name or self.name)
+        if player is None:
+            return self.reset(name, mode)
+        self.gc.player = player
+        self.gc.enemy = None
+        self.gc.collect_mining()
+        self.done = False
+        self.turns = 0
+        return self.observation()
+
+    def observation(self, error: str = None) -> dict:
+        phase = self.phase
+        return {
+            "phase": phase,
+            "turn": self.turns,
+            "player": player_state(self.gc.player),
+            "enemy": enemy_state(self.gc.enemy),
+            "win_chance": solve(self.gc.player, self.gc.enemy).win if phase == "battle" else None,
+            "actions": BATTLE_ACTIONS if phase == "battle" else MENU_ACTIONS if phase == "menu" else [],
+            "error": error
+        }
+
+    def step(self, action: str) -> Tuple[dict, float, bool]:
+        if self.done:
+            raise RuntimeError("Session is over; call reset() first")
+        self.turns += 1
+        verb, target, qty = parse_action(action)
+        if self.gc.enemy:
+            reward, error = self._battle_step(verb, target)
+        else:
+            self.gc.collect_mining()
+            reward, error = self._menu_step(verb, target, qty)
+        return self.observation(error), reward, self.done
+
+    def _menu_step(self, verb: str, target: Optional[str], qty: int) -> Tuple[float, Optional[str]]:
+        gc = self.gc
+        if verb == "explore":
+            gc.enemy = gc.create_enemy()
+        elif verb == "mine":
+            gc.mine(max(1, qty))
+        elif verb == "buy":
+            if not gc.buy(_lookup(target, gc.content.items), qty):
+                return 0.0, f"could not buy {target}"
+        elif verb == "sell":
+            if target and target.lower() == "all":
+                gc.sell_all()
+            elif not gc.sell(_lookup(target, gc.content.resources), qty):
+                return 0.0, f"could not sell {target}"
+        elif verb == "use":
+            if not gc.use_item(_lookup(target, gc.content.items)):
+                return 0.0, f"could not use {target}"
+        elif verb == "recommend":
+            objective = (target or "win").lower()
+            if objective not in OBJECTIVES:
+                return 0.0, f"unknown objective {target!r}"
+            advice = plan(gc.player, objective, content=gc.content)
+            if not advice.items:
+                return 0.0, "nothing worth buying"
+            gc.buy_and_use(advice.items)
+        elif verb == "save":
+            gc.save_game()
+        elif verb == "quit":
+            self.done = True
+        else:
+            return 0.0, f"unknown action {verb!r}"
+        return 0.0, None
+
+    def _battle_step(self, verb: str, target: Optional[str]) -> Tuple[float, Optional[str]]:
+        gc, enemy = self.gc, self.gc.enemy
+        if verb in ("attack", "auto"):
+            if verb == "auto":
+                gc.auto_resolve(enemy)
+            else:
+                gc.attack(enemy)
+            if enemy.health <= 0 or gc.player.health <= 0:
+                gc.enemy = None
+                if gc.end_battle(enemy):
+                    return 1.0, None
+                self.done = True
+                return -1.0, None
+        elif verb == "run":
+            if gc.flee():
+                gc.enemy = None
+        elif verb == "use":
+            if not gc.use_item(_lookup(target, gc.content.items)):
+                return 0.0, f"could not use {target}"
+        else:
+            return 0.0, f"unknown action {verb!r}"
+        return 0.0, None
+
+
+class VectorSession:
+    """Steps N independent sessions in one call.
+
+    Sessions that finish are reset automatically, so the observation returned
+    alongside done=True is already the first observation of the next game.
+    """
+
+    def __init__(self, n: int, name: str = "Agent", mode: str = "normal", store=None, seed: int = None):
+        self.sessions = [GameSession(f"{name}{i}", mode, store, None if seed is None else seed + i)
+                         for i in range(n)]
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def reset(self) -> List[dict]:
+        return [s.reset() for s in self.sessions]
+
+    def step(self, actions: List[str]) -> Tuple[List[dict], List[float], List[bool]]:
+        if len(actions) != len(self.sessions):
+            raise ValueError(f"Expected {len(self.sessions)} actions, got {len(actions)}")
+        observations, rewards, dones = [], [], []
+        for session, action in zip(self.sessions, actions):
+            obs, reward, done = session.step(action)
+            if done:
+                obs = session.reset()
+            observations.append(obs)
+            rewards.append(reward)
+            dones.append(done)
+        return observations, rewards, dones
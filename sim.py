@@ -0,0 +1,157 @@
+"""Headless battle simulator for balance sweeps.
+
+Resolves many battles at once as NumPy arrays, using the same combat rules as
+GameController.battle: 15% crits, `attack - defense` with jitter and a floor
+of 1, an enemy counter-strike while it is alive and a 30% flee failure.
+"""
+import argparse
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from models import Player, ENEMIES
+
+CRIT_CHANCE = 0.15
+FLEE_FAIL_CHANCE = 0.3
+
+LOSS, WIN, FLED = 0, 1, 2
+
+
+def player_stats(mode: str, level: int) -> Tuple[int, int, int]:
+    """(max_health, attack, defense) of a freshly levelled character."""
+    base = Player("sim", mode)
+    ups = level - 1
+    return base.max_health + 25 * ups, base.attack + 5 * ups, base.defense + 3 * ups
+
+
+def enemy_stats(mode: str, level: int) -> np.ndarray:
+    """One (health, attack, defense) row per enemy template, as create_enemy scales them."""
+    enemies = ENEMIES.get(mode, ENEMIES["normal"])
+    rows = [(h + level * 10, a + level * 3, d + level) for _, h, a, d in enemies]
+    return np.array(rows, dtype=np.int64)
+
+
+class BattleReport:
+    def __init__(self, mode: str, level: int, outcome: np.ndarray, turns: np.ndarray,
+                 hp_left: np.ndarray, max_health: int):
+        self.mode = mode
+        self.level = level
+        self.outcome = outcome
+        self.turns = turns
+        self.hp_left = hp_left
+        self.max_health = max_health
+
+    @property
+    def battles(self) -> int:
+        return len(self.outcome)
+
+    @property
+    def win_rate(self) -> float:
+        return float(np.mean(self.outcome == WIN))
+
+    @property
+    def flee_rate(self) -> float:
+        return float(np.mean(self.outcome == FLED))
+
+    def turns_histogram(self) -> np.ndarray:
+        """Count of battles by number of turns taken (index = turns)."""
+        return np.bincount(self.turns)
+
+    def hp_percentiles(self, q=(5, 25, 50, 75, 95)) -> Dict[int, float]:
+        won = self.hp_left[self.outcome == WIN]
+        if not len(won):
+            return {p: 0.0 for p in q}
+        return dict(zip(q, np.percentile(won, q).tolist()))
+
+    def summary(self) -> dict:
+        won = self.outcome == WIN
+        return {
+            "mode": self.mode, "level": self.level, "battles": self.battles,
+            "win_rate": self.win_rate, "flee_rate": self.flee_rate,
+            "mean_turns": float(self.turns.mean()),
+            "mean_turns_to_kill": float(self.turns[won].mean()) if won.any() else 0.0,
+            "mean_hp_left": float(self.hp_left[won].mean()) if won.any() else 0.0,
+            "max_health": self.max_health,
+        }
+
+
+def simulate(mode: str, level: int, n: int = 100_000, flee_below: float = 0.0,
+             rng: Optional[np.random.Generator] = None) -> BattleReport:
+    """Fight `n` independent battles of a fresh, full-health character at `level`.
+
+    The player always attacks, except that once their HP drops below
+    `flee_below` (a fraction of max health) they try to run instead.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    max_hp, p_atk, p_def = player_stats(mode, level)
+
+    templates = enemy_stats(mode, level)
+    pick = rng.integers(len(templates), size=n)
+    e_hp = templates[pick, 0].copy()
+    # Both strikes only depend on the enemy template, so precompute the bases.
+    p_base = p_atk - templates[pick, 2]
+    e_base = templates[pick, 1] - p_def
+
+    p_hp = np.full(n, max_hp, dtype=np.int64)
+    outcome = np.full(n, LOSS, dtype=np.int8)
+    turns = np.zeros(n, dtype=np.int64)
+    flee_hp = flee_below * max_hp
+
+    live = np.arange(n)
+    while len(live):
+        turns[live] += 1
+        fleeing = p_hp[live] < flee_hp
+        runners, fighters = live[fleeing], live[~fleeing]
+        escaped = rng.random(len(runners)) > FLEE_FAIL_CHANCE
+        outcome[runners[escaped]] = FLED
+
+        m = len(fighters)
+        dmg = np.maximum(1, p_base[fighters] + rng.integers(-2, 6, size=m))
+        dmg[rng.random(m) < CRIT_CHANCE] *= 2
+        e_hp[fighters] -= dmg
+        killed = e_hp[fighters] <= 0
+        outcome[fighters[killed]] = WIN
+
+        hitters = fighters[~killed]
+        p_hp[hitters] -= np.maximum(1, e_base[hitters] + rng.integers(-2, 3, size=len(hitters)))
+        live = np.concatenate([hitters[p_hp[hitters] > 0], runners[~escaped]])
+
+    return BattleReport(mode, level, outcome, turns, np.maximum(p_hp, 0), max_hp)
+
+
+def sweep(modes: Iterable[str] = ("easy", "normal", "hardcore"), levels: Iterable[int] = range(1, 101),
+          n: int = 100_000, flee_below: float = 0.0, seed: Optional[int] = None) -> Dict[Tuple[str, int], BattleReport]:
+    rng = np.random.default_rng(seed)
+    return {(mode, lvl): simulate(mode, lvl, n, flee_below, rng) for mode in modes for lvl in levels}
+
+
+def _parse_levels(text: str) -> range:
+    lo, _, hi = text.partition("-")
+    return range(int(lo), int(hi or lo) + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless battle balance sweep.")
+    parser.add_argument("--modes", nargs="+", default=["easy", "normal", "hardcore"])
+    parser.add_argument("--levels", type=_parse_levels, default=range(1, 101), help="e.g. 1-100 or 5")
+    parser.add_argument("-n", "--battles", type=int, default=100_000)
+    parser.add_argument("--flee-below", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    reports = sweep(args.modes, args.levels, args.battles, args.flee_below, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'mode':<9} {'lvl':>3} {'win%':>7} {'flee%':>6} {'turns':>6} {'hp left':>8}")
+    for r in reports.values():
+        s = r.summary()
+        print(f"{s['mode']:<9} {s['level']:>3} {s['win_rate']*100:>6.2f}% {s['flee_rate']*100:>5.1f}% "
+              f"{s['mean_turns_to_kill']:>6.2f} {s['mean_hp_left']:>8.1f}")
+    total = sum(r.battles for r in reports.values())
+    print(f"\n{total:,} battles in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,76 @@
+import argparse
+import json
+import os
+import shlex
 import subprocess
+import sys
 import time
+from typing import Optional
 from openai import OpenAI
+import metrics
+from decision_cache import DecisionCache
+from game_pool import GamePool
+from observation import ObservationCompactor
+from transcript import CONSOLE_MODES, Transcript
 
 # --- CONFIGURATION ---
 MODEL_NAME = "gemma:2b"  # The Ollama model you want to use
 GAME_COMMAND = "python main.py" # The command to start the RPG game
+GAME_PROTOCOL = "text" # "text" scrapes prompts from the screen, "jsonl" uses main.py --protocol jsonl
 AI_SPEED = 0.5 # Seconds to wait between AI actions, for watchability
+SERVER_URL = 'http://192.168.1.117:1234/v1' # Your LM Studio (OpenAI-compatible) server
+TOKEN_BUDGET = 1500 # The history sent to the model is trimmed to about this many tokens
+DECISION_CACHE = "ai_decisions.db" # Remembers decisions for repeated game states across runs; None to disable
+PROMPT_MARKERS = ('):', 'name:', 'Name:', 'resolve:', 'Choice:', '>') # Line endings of every game prompt
+
+SYSTEM_PROMPT = """
+You are a strategic AI playing a text-based RPG. Your goal is to survive as long as possible.
+Analyze the recent history and the current game state to make the most logical move.
+First, explain your reasoning in a 'Thought' line.
+Then, on a new line, state the single command to execute.
+
+Your response MUST be in this exact two-line format:
+Thought: [Your reasoning here]
+[command]
+
+The command MUST be one of the following: 'explore', 'rest', 'attack', 'run', 'quit'
+"""
 
 class AIPlayer:
     """The AI's 'brain'. It now has a short-term memory."""
 
-    def __init__(self, model_name):
+    def __init__(self, model_name, cache: Optional[DecisionCache] = None):
         # Point the OpenAI client to your LM Studio server
         self.client = OpenAI(
-            base_url='http://192.168.1.117:1234/v1',
+            base_url=SERVER_URL,
             api_key='lm-studio', # can be anything
         )
         # We don't need to specify the model name here, as it's determined
         # by the model you've loaded in LM Studio.
         self.model = "local-model" # A placeholder name
+        self.cache = cache
         
         # The system prompt is now more direct, as the history will provide context
-        self.system_prompt = """
-You are a strategic AI playing a text-based RPG. Your goal is to survive as long as possible.
-Analyze the recent history and the current game state to make the most logical move.
-First, explain your reasoning in a 'Thought' line.
-Then, on a new line, state the single command to execute.
+        self.system_prompt = SYSTEM_PROMPT
 
-Your response MUST be in this exact two-line format:
-Thought: [Your reasoning here]
-[command]
-
-The command MUST be one of the following: 'explore', 'rest', 'attack', 'run', 'quit'
-"""
+    def get_action(self, history: list, screen: Optional[str] = None,
+                   previous: Optional[str] = None) -> dict: # Takes a list of messages
+        """Gets a thought and action from the LLM based on conversation history.
 
-    def get_action(self, history: list) -> dict: # Takes a list of messages
-        """Gets a thought and action from the LLM based on conversation history."""
+        Decisions are cached on the raw `screen` the last message was made
+        from; the compacted message itself only carries what changed. If the
+        `previous` screen has the same key, the last action changed nothing
+        (the game asked again), so the cached decision is dropped rather
+        than replayed.
+        """
+        key = None
+        if self.cache is not None and screen is not None:
+            key = self.cache.key(screen)
+            if previous is not None and self.cache.key(previous) == key:
+                self.cache.evict(key)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
         try:
             # The history is now the main context
             messages = [{"role": "system", "content": self.system_prompt}] + history
@@ -46,129 +81,198 @@ The command MUST be one of the following: 'explore', 'rest', 'attack', 'run', 'q
                 temperature=0.7,
                 max_tokens=100 # More tokens to allow for a thought
             )
-            raw_response = response.choices[0].message.content.strip()
-            
-            # Parse the AI's two-line response
-            thought = "No thought provided."
-            action = "explore" # Default action
-            
-            lines = raw_response.split('\n')
-            for line in lines:
-                if line.lower().startswith('thought:'):
-                    thought = line.split(':', 1)[1].strip()
-                else:
-                    # Assume the last non-thought line is the command
-                    cleaned_line = line.strip(".,'\"` ")
-                    if cleaned_line: # Make sure it's not an empty line
-                        action = cleaned_line
-
-            return {"thought": thought, "action": action}
+            decision = self.parse_response(response.choices[0].message.content)
+            if key is not None:
+                self.cache.put(key, decision)
+            return decision
 
         except Exception as e:
             print(f"--- AI ERROR: Could not parse thought/action. Error: {e} ---")
             return {"thought": "I seem to be confused.", "action": "rest"}
 
+    @staticmethod
+    def parse_response(raw_response: str) -> dict:
+        """Splits the AI's two-line reply into its thought and command."""
+        thought = "No thought provided."
+        action = "explore" # Default action
+        
+        lines = raw_response.strip().split('\n')
+        for line in lines:
+            if line.lower().startswith('thought:'):
+                thought = line.split(':', 1)[1].strip()
+            else:
+                # Assume the last non-thought line is the command
+                cleaned_line = line.strip(".,'\"` ")
+                if cleaned_line: # Make sure it's not an empty line
+                    action = cleaned_line
+
+        return {"thought": thought, "action": action}
+
+def game_argv(command: str) -> list:
+    """Splits GAME_COMMAND into an argv, running "python" as this interpreter; no shell involved."""
+    argv = shlex.split(command)
+    if argv and argv[0] in ("python", "python3"):
+        argv[0] = sys.executable
+    return argv
+
 class GameRunner:
     """Manages the game subprocess and communication."""
 
     def __init__(self, command):
         self.process = subprocess.Popen(
-            command,
-            shell=True,
+            game_argv(command),
+            cwd=os.path.dirname(os.path.abspath(__file__)),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1 # Line-buffered
+            stderr=subprocess.PIPE
         )
 
     def read_output(self) -> str:
-        """Reads all output from the game one character at a time until it waits for input."""
-        output_chars = []
-        current_line = ""
-        while self.is_running():
-            # Read one character at a time
-            char = self.process.stdout.read(1)
-            if not char:
+        """Reads the game's output in chunks until the last line on screen is a prompt."""
+        chunks = []
+        fd = self.process.stdout.fileno()
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
                 # End of stream, process has likely closed
                 break
-            
-            # Print the character to your console so you can watch the game live
-            print(char, end='', flush=True)
-            
-            # Store the character for the AI
-            output_chars.append(char)
-            
-            # Build up the current line to check for our prompt markers
-            if char == '\n':
-                current_line = ""
-            else:
-                current_line += char
-
-            # If the current line ends with a prompt, we know the game is waiting for us.
-            if current_line.strip().endswith(('):', 'name:', '>')):
+            chunks.append(data)
+            # The prompt may straddle two reads, so look at the last two chunks.
+            tail = b"".join(chunks[-2:]).decode(errors="replace").rsplit("\n", 1)[-1]
+            if tail.strip().endswith(PROMPT_MARKERS):
                 break
-                
-        return "".join(output_chars)
+        return b"".join(chunks).decode(errors="replace")
 
     def send_input(self, action: str):
         """Sends a command to the game."""
-        self.process.stdin.write(action + '\n')
+        self.process.stdin.write((action + '\n').encode())
         self.process.stdin.flush()
 
     def is_running(self) -> bool:
         """Checks if the game process is still active."""
         return self.process.poll() is None
 
-if __name__ == "__main__":
-    print("--- AI GAMER AGENT (MEMORY EDITION) INITIALIZING ---")
-    print(f"--- Model: {MODEL_NAME} ---")
-    print("--- Make sure your LM Studio server is running! ---")
-    
-    ai_player = AIPlayer(MODEL_NAME)
-    game = GameRunner(GAME_COMMAND)
-    
-    # Initialize a conversation history
+class JsonlGameRunner(GameRunner):
+    """Drives `main.py --protocol jsonl`: every turn is one JSON object on one line."""
+
+    def __init__(self, command):
+        super().__init__(command + " --protocol jsonl")
+        self.last_turn: Optional[dict] = None
+
+    def read_turn(self) -> Optional[dict]:
+        """Reads the next screen as a dict, or None once the game has exited."""
+        line = self.process.stdout.readline()
+        if not line:
+            return None
+        self.last_turn = json.loads(line)
+        return self.last_turn
+
+    def read_output(self) -> str:
+        turn = self.read_turn()
+        if turn is None:
+            return ""
+        return turn["screen"] + turn.get("prompt", "")
+
+    def send_input(self, action: str):
+        super().send_input(json.dumps({"input": action}))
+
+def play(ai_player: AIPlayer, game: GameRunner, compactor: ObservationCompactor,
+         transcript: Optional[Transcript] = None, /, **labels):
+    # The transcript shows the game on the console and, given a path, logs every step
+    transcript = transcript or Transcript()
     conversation_history = []
-    
-    print("\n--- GAME STARTING ---\n")
-    time.sleep(2)
+    previous_state = None # The screen the last action answered
+    compactor.reset() # Each game starts without the last one's stats and menus
 
     while game.is_running():
         # 1. Read the state of the game
-        game_state = game.read_output()
+        with metrics.timer("driver.read"):
+            game_state = game.read_output()
         if not game_state: # If there's no output, the game has probably ended
             break
+        metrics.count("driver.turns")
+        metrics.count("driver.bytes_read", len(game_state.encode()))
+        metrics.count("driver.battles", game_state.count("Victory!") + game_state.count("DEFEATED"))
         
-        # 2. Add the game's output to the history
-        conversation_history.append({"role": "user", "content": game_state})
+        # 2. Add a compact record of the game's output to the history
+        conversation_history.append({"role": "user", "content": compactor.compact(game_state)})
 
-        # 3. Keep the history to a manageable size (e.g., last 5 exchanges)
-        # An exchange is 2 messages (user + assistant), so we keep 10 messages total.
-        if len(conversation_history) > 10:
-            conversation_history = conversation_history[-10:]
+        # 3. Keep the history within the token budget
+        conversation_history = compactor.trim(conversation_history, TOKEN_BUDGET)
 
         # 4. Get the AI's next move based on the history
-        ai_decision = ai_player.get_action(conversation_history)
+        start = time.perf_counter()
+        with metrics.timer("driver.model"):
+            ai_decision = ai_player.get_action(conversation_history, game_state, previous_state)
+        previous_state = game_state
+        latency = time.perf_counter() - start
         thought = ai_decision['thought']
         action = ai_decision['action']
         
-        # 5. Display both the thought and the action
-        print(f"\n🤔 AI THOUGHT: {thought}")
-        print(f">>> AI chooses: {action}\n")
+        # 5. Record the step: screen, thought, action and model latency
+        transcript.step(game_state, thought, action, latency, **labels)
 
         # 6. Add the AI's full response to the history for self-reflection
         ai_full_response = f"Thought: {thought}\n{action}"
         conversation_history.append({"role": "assistant", "content": ai_full_response})
         
-        # 7. Send the chosen action to the game
-        game.send_input(action)
+        # 7. Send the chosen action to the game, unless that was its final screen
+        if not game.is_running():
+            break
+        with metrics.timer("driver.send"):
+            game.send_input(action)
 
         # 8. Wait a moment so we can watch
         time.sleep(AI_SPEED)
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Let a local model play the game.")
+    parser.add_argument("--games", type=int, default=1,
+                        help="play this many games on a warm game_pool worker instead of a fresh process each")
+    parser.add_argument("--profile", metavar="PATH", nargs="?", const="driver_metrics.json",
+                        help="run under cProfile, print the hot spots and write read/model/send metrics JSON to PATH")
+    parser.add_argument("--transcript", metavar="PATH", help="log every step as JSON lines to PATH (rotated and gzipped)")
+    parser.add_argument("--max-log-mb", type=float, default=10.0, help="rotate the transcript at this size")
+    parser.add_argument("--console", choices=CONSOLE_MODES, default="full",
+                        help="mirror the game to the console in full, as throttled progress lines, or not at all")
+    args = parser.parse_args()
+
+    print("--- AI GAMER AGENT (MEMORY EDITION) INITIALIZING ---")
+    print(f"--- Model: {MODEL_NAME} ---")
+    print("--- Make sure your LM Studio server is running! ---")
+    
+    cache = DecisionCache(path=DECISION_CACHE) if DECISION_CACHE else None
+    ai_player = AIPlayer(MODEL_NAME, cache)
+    pool = GamePool(size=1) if args.games > 1 else None
+    game = None
+    compactor = ObservationCompactor()
+    transcript = Transcript(args.transcript, int(args.max_log_mb * 1024 * 1024), console=args.console)
+    
+    print("\n--- GAME STARTING ---\n")
+    time.sleep(2)
+
+    with metrics.profiling(args.profile, instrument_methods=False):
+        for game_number in range(args.games):
+            if pool is not None:
+                game = pool.acquire()
+                print(f"--- Game {game_number + 1} of {args.games} ---")
+            else:
+                game = JsonlGameRunner(GAME_COMMAND) if GAME_PROTOCOL == "jsonl" else GameRunner(GAME_COMMAND)
+            play(ai_player, game, compactor, transcript, game=game_number + 1)
+            if pool is not None:
+                pool.release(game)
+
+    transcript.close()
     print("\n--- GAME OVER ---")
-    # Capture any final error messages
-    stdout, stderr = game.process.communicate()
-    if stdout: print("Final STDOUT:\n", stdout)
-    if stderr: print("Final STDERR:\n", stderr)
\ No newline at end of file
+    print(compactor.report())
+    if cache is not None:
+        print(cache.report())
+        cache.close()
+    if pool is not None:
+        print(pool.report())
+        pool.close()
+    else:
+        # Capture any final error messages
+        stdout, stderr = game.process.communicate()
+        if stdout: print("Final STDOUT:\n", stdout.decode(errors="replace"))
+        if stderr: print("Final STDERR:\n", stderr.decode(errors="replace"))
\ No newline at end of file
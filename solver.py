@@ -0,0 +1,135 @@
+"""Exact battle outcomes for a player who attacks every round.
+
+A fight is a Markov chain over (player HP, enemy HP). Each round the player
+hits for max(1, attack - defense + randint(-2, 5)), doubled on a 15% crit, and
+a surviving enemy strikes back for max(1, attack - defense + randint(-2, 2)),
+the same rules as GameController.attack. Enemy HP strictly falls every round,
+so the chain has no cycles and every state is solved exactly once:
+
+    odds = solve(player, enemy)
+    odds.win, odds.turns, odds.hp_lost   # probability, expected rounds, expected damage taken
+
+Solvers are cached per (attack, defense) matchup and remember every state they
+have visited, so the repeated queries made during one battle are free.
+"""
+import argparse
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+from models import Player, Enemy, ENEMIES
+
+CRIT_CHANCE = 0.15
+PLAYER_JITTER = range(-2, 6)
+ENEMY_JITTER = range(-2, 3)
+
+
+class Odds(NamedTuple):
+    win: float
+    turns: float
+    hp_lost: float
+
+
+def damage_distribution(base: int, jitter: range, crit: float = 0.0) -> Tuple[Tuple[int, float], ...]:
+    """((damage, probability), ...) for one strike, with equal damage values merged."""
+    dist = Counter()
+    for j in jitter:
+        dmg = max(1, base + j)
+        dist[dmg] += (1 - crit) / len(jitter)
+        if crit:
+            dist[dmg * 2] += crit / len(jitter)
+    return tuple(sorted(dist.items()))
+
+
+class BattleSolver:
+    def __init__(self, player_attack: int, player_defense: int, enemy_attack: int, enemy_defense: int):
+        self.strike = damage_distribution(player_attack - enemy_defense, PLAYER_JITTER, CRIT_CHANCE)
+        self.counter = damage_distribution(enemy_attack - player_defense, ENEMY_JITTER)
+        # (player_hp, enemy_hp, phase) -> Odds, where phase 0 is "player to strike"
+        # and phase 1 is "enemy to strike back".
+        self._memo: Dict[Tuple[int, int, int], Odds] = {}
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def _children(self, state):
+        p, e, phase = state
+        if phase == 0:
+            return [(p, e - d, 1) for d, _ in self.strike if e - d > 0]
+        return [(p - d, e, 0) for d, _ in self.counter if p - d > 0]
+
+    def _combine(self, state) -> Odds:
+        p, e, phase = state
+        memo = self._memo
+        win = turns = lost = 0.0
+        if phase == 0:
+            for d, prob in self.strike:
+                if e - d <= 0:
+                    win += prob
+                else:
+                    child = memo[(p, e - d, 1)]
+                    win += prob * child.win
+                    turns += prob * child.turns
+                    lost += prob * child.hp_lost
+            return Odds(win, 1.0 + turns, lost)
+        for d, prob in self.counter:
+            lost += prob * min(d, p)
+            if p - d > 0:
+                child = memo[(p - d, e, 0)]
+                win += prob * child.win
+                turns += prob * child.turns
+                lost += prob * child.hp_lost
+        return Odds(win, turns, lost)
+
+    def odds(self, player_hp: int, enemy_hp: int) -> Odds:
+        if enemy_hp <= 0:
+            return Odds(1.0, 0.0, 0.0)
+        if player_hp <= 0:
+            return Odds(0.0, 0.0, 0.0)
+        root = (player_hp, enemy_hp, 0)
+        memo = self._memo
+        # Depth-first over an explicit stack: long fights would overflow Python's recursion limit.
+        stack = [root]
+        while stack:
+            state = stack[-1]
+            if state in memo:
+                stack.pop()
+                continue
+            pending = [child for child in self._children(state) if child not in memo]
+            if pending:
+                stack.extend(pending)
+            else:
+                memo[state] = self._combine(state)
+                stack.pop()
+        return memo[root]
+
+
+@lru_cache(maxsize=256)
+def solver_for(player_attack: int, player_defense: int, enemy_attack: int, enemy_defense: int) -> BattleSolver:
+    return BattleSolver(player_attack, player_defense, enemy_attack, enemy_defense)
+
+
+def solve(player: Player, enemy: Enemy) -> Odds:
+    """Odds of the fight from its current HP, if the player attacks every round."""
+    solver = solver_for(player.attack, player.defense, enemy.attack, enemy.defense)
+    return solver.odds(player.health, enemy.health)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact win chances against every enemy of a mode.")
+    parser.add_argument("--mode", default="normal", choices=sorted(ENEMIES))
+    parser.add_argument("--level", type=int, default=1)
+    args = parser.parse_args()
+
+    player = Player("solver", args.mode)
+    for _ in range(args.level - 1):
+        player.level_up()
+    lvl = args.level
+    print(f"{'Enemy':<15} {'Win':>7} {'Turns':>7} {'HP lost':>8}")
+    for name, h, a, d in ENEMIES[args.mode]:
+        odds = solve(player, Enemy(name, h + lvl * 10, a + lvl * 3, d + lvl, lvl))
+        print(f"{name:<15} {odds.win:>7.1%} {odds.turns:>7.2f} {odds.hp_lost:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""A tiny OpenAI-compatible server for testing the agent drivers offline.
+
+Answers /v1/chat/completions and /v1/completions (including batched prompt
+lists) with a fixed policy that plays the game's numbered menus, so whole
+agent runs can be exercised without a model.
+
+    python stub_llm_server.py --port 1234
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def choose(screen: str) -> str:
+    """Picks a reply for the last game screen."""
+    last = screen.rstrip().rsplit("\n", 1)[-1]
+    if "(y/n)" in last:
+        return "n"
+    if "Name" in last:
+        return "Stub"
+    if "Mode" in last:
+        return "normal"
+    if "Actions" in last:
+        return "a"
+    return "1"
+
+
+def reply_for(screen: str) -> str:
+    return f"Thought: The stub always presses on.\n{choose(screen)}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        stats = self.server.stats
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path.endswith("/chat/completions"):
+            with self.server.lock:
+                stats["chat"] += 1
+            content = reply_for(request["messages"][-1]["content"])
+            self._send(200, {
+                "id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}]
+            })
+        elif self.path.endswith("/completions") and self.server.batching:
+            prompts = request["prompt"] if isinstance(request["prompt"], list) else [request["prompt"]]
+            with self.server.lock:
+                stats["batches"] += 1
+                stats["batched_prompts"] += len(prompts)
+                stats["largest_batch"] = max(stats["largest_batch"], len(prompts))
+            self._send(200, {
+                "id": "stub", "object": "text_completion", "created": 0, "model": "stub",
+                "choices": [{"index": i, "text": reply_for(p), "finish_reason": "stop", "logprobs": None}
+                            for i, p in enumerate(prompts)]
+            })
+        else:
+            self._send(404, {"error": {"message": f"{self.path} not supported"}})
+
+
+def start(port: int = 0, batching: bool = True) -> ThreadingHTTPServer:
+    """Serves in a daemon thread; the URL is f"http://127.0.0.1:{server.server_port}/v1"."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.batching = batching
+    server.lock = threading.Lock()
+    server.stats = {"chat": 0, "batches": 0, "batched_prompts": 0, "largest_batch": 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible server for agent tests.")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--no-batch", action="store_true", help="reject /v1/completions like a chat-only server")
+    args = parser.parse_args()
+    server = start(args.port, batching=not args.no_batch)
+    print(f"Stub LLM server on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import asyncio
+import gc
+import io
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+import stub_llm_server
+from agent_runner import AsyncAIPlayer, run_games
+from decision_cache import DecisionCache
+from models import Player
+from small_llm_play_game import AIPlayer, PROMPT_MARKERS
+from ui import GameUI
+
+COMMAND = f"{sys.executable} main.py --plain"
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_port}/v1"
+
+
+def test_prompt_markers_end_prompts_but_not_status_lines():
+    prompts = ["Select item # (or 'c' to cancel): ", "Choice: ", "How many Stone do you want to buy? (default 1): ",
+               "Buy and use these? (y/n): ", "Select resource # or 'A' (or 'c' to cancel): ",
+               "How many Stone to sell? (max 3): ", "Enter character name: ",
+               "Actions: [A]ttack, [R]un, [I]tem, A[u]to-resolve: ", "Character Name: ",
+               "Mode (easy/normal/hardcore): ", "Continue previous adventure? (y/n): ", "> ",
+               "Dig how many times? ('auto' toggles idle mining, now off) (default 1): "]
+    assert all(p.strip().endswith(PROMPT_MARKERS) for p in prompts)
+    ui = GameUI(stream=io.StringIO(), plain=True)
+    ui.print_status(Player("Hero"))
+    ui.flush()
+    assert not any(line.strip().endswith(PROMPT_MARKERS) for line in ui.stream.getvalue().splitlines())
+
+
+def test_concurrent_games_share_batched_requests():
+    server = stub_llm_server.start()
+    try:
+        summary = asyncio.run(run_games(6, concurrency=3, command=COMMAND, base_url=_url(server),
+                                        batch=True, max_turns=8))
+    finally:
+        server.shutdown()
+    assert len(summary["games"]) == 6
+    assert all(g["turns"] > 3 for g in summary["games"])
+    assert server.stats["chat"] == 0
+    assert server.stats["largest_batch"] > 1
+    assert summary["model_requests"] < sum(g["turns"] for g in summary["games"])
+
+
+def test_falls_back_to_chat_without_batch_support():
+    server = stub_llm_server.start(batching=False)
+    try:
+        summary = asyncio.run(run_games(2, concurrency=2, command=COMMAND, base_url=_url(server),
+                                        batch=True, max_turns=4))
+    finally:
+        server.shutdown()
+    assert all(g["turns"] == 4 for g in summary["games"])
+    assert server.stats["batches"] == 0 and server.stats["chat"] >= 6
+
+
+class ShortBatchClient:
+    """Answers a batch with fewer completions than prompts; chat always works."""
+
+    def __init__(self):
+        self.chats = 0
+        self.completions = SimpleNamespace(create=self._batch)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+
+    async def _batch(self, prompt, **kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, text="Thought: a\n1")])
+
+    async def _chat(self, messages, **kwargs):
+        self.chats += 1
+        message = SimpleNamespace(content="Thought: b\n2")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_malformed_batch_falls_back_for_every_game():
+    async def run():
+        ai = AsyncAIPlayer(ShortBatchClient(), batch=True, window=0.01)
+        return await asyncio.gather(*(ai.get_action([{"role": "user", "content": f"s{i}"}]) for i in range(3)))
+
+    decisions = asyncio.run(asyncio.wait_for(run(), 5))
+    assert [d["action"] for d in decisions] == ["2", "2", "2"]
+
+
+def test_decisions_are_cached_on_the_raw_screen():
+    client = ShortBatchClient()
+    ai = AsyncAIPlayer(client, cache=DecisionCache())
+    menu = "HP: [####] 100/100\n1. Explore the Wilds\n> "
+    shop = "=== VILLAGE SHOP ===\n0. Exit\nChoice: "
+
+    async def run():
+        # The compacted messages are identical, the screens are not, and vice versa.
+        await ai.get_action([{"role": "user", "content": "prompt: >"}], menu)
+        await ai.get_action([{"role": "user", "content": "prompt: >"}], shop)
+        await ai.get_action([{"role": "user", "content": "hp 100/100(+40) | prompt: >"}], menu)
+
+    asyncio.run(run())
+    assert client.chats == 2
+
+
+
+class ChatClient:
+    """Synchronous stand-in for OpenAI that always answers 'explore'."""
+
+    def __init__(self):
+        self.chats = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+
+    def _chat(self, messages, **kwargs):
+        self.chats += 1
+        message = SimpleNamespace(content="Thought: c\nexplore")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_cached_decision_that_changes_nothing_is_asked_again():
+    menu = "HP: [####] 100/100\n1. Explore the Wilds\n> "
+    history = [{"role": "user", "content": "prompt: >"}]
+    client = ShortBatchClient()
+    ai = AsyncAIPlayer(client, cache=DecisionCache())
+
+    async def run():
+        await ai.get_action(history, menu)
+        # The game redrew the same menu: the cached reply was not one of its options.
+        await ai.get_action(history, menu, menu)
+        await ai.get_action(history, menu, menu)
+
+    asyncio.run(run())
+    assert client.chats == 3
+
+    sync = AIPlayer("local-model", cache=DecisionCache())
+    sync.client = ChatClient()
+    for previous in (None, menu, menu):
+        sync.get_action(history, menu, previous)
+    assert sync.client.chats == 3
+    sync.get_action(history, menu, "=== VILLAGE SHOP ===\nChoice: ")
+    assert sync.client.chats == 3
+
+
+def test_batches_in_flight_are_kept_until_done():
+    class SlowBatchClient(ShortBatchClient):
+        async def _batch(self, prompt, **kwargs):
+            await release.wait()
+            return SimpleNamespace(choices=[SimpleNamespace(index=i, text="Thought: a\n1") for i in range(len(prompt))])
+
+    async def run():
+        ai = AsyncAIPlayer(SlowBatchClient(), batch=True, window=0.001)
+        games = asyncio.gather(*(ai.get_action([{"role": "user", "content": f"s{i}"}]) for i in range(2)))
+        await asyncio.sleep(0.05)
+        gc.collect()
+        in_flight = len(ai._tasks)
+        release.set()
+        decisions = await asyncio.wait_for(games, 5)
+        return in_flight, decisions, ai._tasks
+
+    release = asyncio.Event()
+    in_flight, decisions, tasks = asyncio.run(run())
+    assert in_flight == 1 and not tasks
+    assert [d["action"] for d in decisions] == ["1", "1"]
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import os
+
+from analyze import analyze, group_files, write_rows
+from models import Player
+from replay import Journal
+from transcript import Transcript
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_agent_log_runs_and_tests():
+    summary = analyze([os.path.join(GAME_DIR, "log.log")])
+    assert len(summary.rows) == 4
+    assert all(row[2] == "agent" and row[4] == "finished" for row in summary.rows)
+    assert sum(row[6] for row in summary.rows) == 12
+    assert sum(row[5] for row in summary.rows) == 5
+    assert summary.actions["agent"]["TASK FINISHED"] == 4
+
+
+def test_rotated_transcript_is_read_as_one_stream(tmp_path):
+    path = str(tmp_path / "agent.jsonl")
+    transcript = Transcript(path, max_bytes=1000, backups=10, console="off", stream=io.StringIO())
+    for game in (1, 2):
+        for i in range(10):
+            screen = "Game Over" if game == 2 and i == 9 else "Choose an option (1-5):"
+            transcript.step(screen, "thinking", "1", 0.05, game=game)
+    transcript.close()
+    assert transcript.rotations > 0
+
+    groups = group_files([str(tmp_path)])
+    assert len(groups) == 1 and groups[0][-1] == path
+    summary = analyze([str(tmp_path)])
+    rows = {row[1]: row for row in summary.rows}
+    assert rows["game 1"][3] == 10 and rows["game 2"][3] == 10
+    assert rows["game 2"][4] == "died"
+    assert rows["game 1"][7] == 50.0
+
+
+def test_journal_sessions(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    journal = Journal(path, seed=7)
+    for reply in ("1", "1", "5"):
+        journal.record_input("main_menu", reply)
+    player = Player("Hero")
+    player.health = 0
+    journal.close(player)
+    (row,) = analyze([path]).rows
+    assert row[2:5] == ("journal", 3, "died")
+
+
+def test_parallel_matches_serial_and_writes_rows(tmp_path):
+    for n in range(3):
+        Transcript(str(tmp_path / f"t{n}.jsonl"), console="off").step("x", "t", "2", 0.01, game=1)
+    paths = [os.path.join(GAME_DIR, "log.log"), str(tmp_path)]
+    serial, parallel = analyze(paths), analyze(paths, jobs=2)
+    assert sorted(serial.rows, key=repr) == sorted(parallel.rows, key=repr)
+    assert serial.actions == parallel.actions
+
+    write_rows(serial, str(tmp_path / "runs.csv"))
+    with open(tmp_path / "runs.csv", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 7
+    write_rows(serial, str(tmp_path / "runs.json"))
+    with open(tmp_path / "runs.json") as f:
+        columns = json.load(f)["columns"]
+    assert len(columns["steps"]) == 7
@@ -1,3 +1,4 @@
+import random
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -5,8 +6,10 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from main import Player
 
 def test_auto_mine():
-    # Create a player
+    # Create a player whose clock the test moves by hand
     player = Player("TestPlayer", "normal")
+    now = [1000.0]
+    player.clock = lambda: now[0]
     
     # Enable test mode
     player.test_mode = True
@@ -14,22 +17,18 @@ def test_auto_mine():
     # Start auto mining
     player.start_auto_mining()
     
-    # Manually trigger mining rewards to test functionality
-    # In test mode, the auto_mine function will stop after 3 intervals
-    import time
-    time.sleep(4)  # Wait for mining to complete
+    # In test mode an interval is one second and an accrual credits at most 3 of them
+    now[0] += 4
+    player.accrue_mining(random.Random(1))
     
     # Check if coins were added
     print(f"Player coins after auto mining: {player.coins}")
     print(f"Mining intervals completed: {player.mining_intervals}")
     
     # Verify the auto mining worked
-    if player.coins == 30 and player.mining_intervals == 3:
-        print("Auto mining test PASSED")
-        return True
-    else:
-        print("Auto mining test FAILED")
-        return False
+    assert player.coins == 30, f"Expected 30 coins, got {player.coins}"
+    assert player.mining_intervals == 3, f"Expected 3 intervals, got {player.mining_intervals}"
 
 if __name__ == "__main__":
-    test_auto_mine()
\ No newline at end of file
+    test_auto_mine()
+    print("Auto mining test PASSED")
@@ -0,0 +1,108 @@
+import random
+
+from engine import GameController
+from main import run_game
+from models import Player, AUTO_MINING_COINS, AUTO_MINING_INTERVAL, AUTO_MINING_MAX_INTERVALS
+from replay import Journal, ScriptedUI, replay
+from saves import JsonSaveStore, player_to_dict
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_accrues_in_test_mode_capped_per_accrual():
+    clock, rng = FakeClock(), random.Random(1)
+    player = Player("Idle")
+    player.clock = clock
+    player.test_mode = True
+    player.start_auto_mining()
+    assert player.accrue_mining(rng) == (0, {}) and player.mining_intervals == 0
+
+    clock.now += 2.5
+    player.accrue_mining(rng)
+    assert player.mining_intervals == 2 and player.coins == 20
+    # A full miner stops at the cap, then earns again from there.
+    clock.now += 100
+    player.accrue_mining(rng)
+    assert player.mining_intervals == 5 and player.coins == 50
+    clock.now += 1
+    player.accrue_mining(rng)
+    assert player.mining_intervals == 6 and player.coins == 60
+
+    player.stop_auto_mining()
+    clock.now += 100
+    assert player.accrue_mining(rng) == (0, {})
+    assert player.coins == 60 and not player.auto_mining
+
+
+def test_reading_and_saving_do_not_draw_from_the_global_rng():
+    clock = FakeClock()
+    player = Player("Idle")
+    player.clock = clock
+    player.start_auto_mining()
+    clock.now += 3 * AUTO_MINING_INTERVAL
+    random.seed(5)
+    state = random.getstate()
+    player.coins -= 5
+    player_to_dict(player)
+    assert random.getstate() == state
+    assert player.coins == -5 and player.mining_intervals == 0
+
+
+def test_offline_progress_applied_on_every_load(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(Player, "default_clock", clock)
+    store = JsonSaveStore(str(tmp_path))
+    player = Player("Away")
+    player.start_auto_mining()
+    clock.now += 10 * AUTO_MINING_INTERVAL
+    player.accrue_mining(random.Random(1))
+    assert player.coins == 10 * AUTO_MINING_COINS
+    store.save(player)
+
+    # Each day offline is capped at the maximum number of intervals, but only that day.
+    for day in (1, 2):
+        clock.now += 24 * 3600
+        gc = GameController(store, random.Random(day))
+        gc.ui = ScriptedUI(["Away"])
+        assert gc.load_game()
+        assert gc.player.mining_intervals == 10 + day * AUTO_MINING_MAX_INTERVALS
+        assert gc.player.coins == (10 + day * AUTO_MINING_MAX_INTERVALS) * AUTO_MINING_COINS
+        assert len(gc.player.inventory) > 0
+        store.save(gc.player)
+
+
+class TickingUI(ScriptedUI):
+    """Moves the clock seven mining intervals on at every prompt."""
+
+    def __init__(self, replies, clock):
+        super().__init__(replies)
+        self.clock = clock
+
+    def ask(self, text, prompt_id=None, options=None):
+        self.clock.now += 7 * AUTO_MINING_INTERVAL
+        return super().ask(text, prompt_id, options)
+
+
+def test_seeded_session_with_idle_mining_replays(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(Player, "default_clock", clock)
+    path = str(tmp_path / "mining.jsonl")
+    gc = GameController(JsonSaveStore(str(tmp_path)), random.Random(9))
+    gc.ui = TickingUI(["n", "Hero", "normal", "3", "auto"] + ["3", "2", "1", "a", "a", "a", "a"] * 3 + ["5"], clock)
+    journal = gc.ui.journal = Journal(path, 9)
+    try:
+        run_game(gc)
+    except EOFError:
+        pass
+    journal.close(gc.player)
+    assert gc.player.mining_intervals > 0
+
+    monkeypatch.setattr(Player, "default_clock", FakeClock(0.0))
+    result = replay(path)
+    assert result["matches"], result
@@ -0,0 +1,131 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from autosave import Autosaver, AutosaveWriter
+from models import Player
+from replay import ScriptedUI
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class SlowStore:
+    """Records save_dict calls; each write waits until `release` is set."""
+
+    def __init__(self):
+        self.saved = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def save_dict(self, data):
+        self.started.set()
+        self.release.wait(5)
+        self.saved.append(data)
+
+
+def test_revision_tracks_saved_fields():
+    player = Player("Hero")
+    before = player.revision
+    player.inventory.add("Stone", 1000)
+    after_add = player.revision
+    assert after_add != before
+    player.clock = lambda: 0.0
+    assert player.revision == after_add
+    player.health -= 1
+    assert player.revision != after_add
+
+
+def test_snapshots_are_coalesced_while_a_write_is_running():
+    store, player = SlowStore(), Player("Hero")
+    saver = Autosaver(store, lambda: player, interval=0.0)
+    saver.checkpoint()
+    assert store.started.wait(5)
+    for coins in range(1, 50):
+        player.coins = coins
+        saver.checkpoint()
+    store.release.set()
+    saver.close()
+    assert [d["coins"] for d in store.saved] == [0, 49]
+    assert saver.writer.coalesced == 48
+
+
+def test_interval_unchanged_and_dead_players_are_skipped():
+    now = [0.0]
+    store, player = SlowStore(), Player("Hero")
+    store.release.set()
+    writer = AutosaveWriter()
+    saver = Autosaver(store, lambda: player, interval=10.0, writer=writer, clock=lambda: now[0])
+    saver.checkpoint()
+    player.coins = 5
+    saver.checkpoint()
+    now[0] = 20.0
+    saver.checkpoint()
+    now[0] = 40.0
+    saver.checkpoint()
+    player.health = 0
+    saver.flush()
+    writer.close()
+    assert writer.writes + writer.coalesced == 2
+    assert store.saved[-1]["coins"] == 5
+
+
+def test_change_inside_the_interval_is_written_when_it_expires():
+    store, player = SlowStore(), Player("Hero")
+    store.release.set()
+    saver = Autosaver(store, lambda: player, interval=0.3)
+
+    def wait_for(writes):
+        deadline = time.monotonic() + 5
+        while len(store.saved) < writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    saver.checkpoint()
+    wait_for(1)
+    player.coins = 7
+    saver.checkpoint()
+    assert len(store.saved) == 1
+    # No further checkpoint: the writer's own timer writes the change.
+    wait_for(2)
+    assert [d["coins"] for d in store.saved] == [0, 7]
+    saver.close()
+
+
+def test_main_autosaves_on_exit(tmp_path):
+    subprocess.run([sys.executable, os.path.join(GAME_DIR, "main.py"), "--plain", "--seed", "1",
+                    "--autosave", "60"],
+                   input="n\nHero\nnormal\n3\n20\n5\n", capture_output=True, text=True, cwd=tmp_path, timeout=60)
+    with open(tmp_path / "Hero_save.json") as f:
+        data = json.load(f)
+    assert data["name"] == "Hero" and sum(data["inv"].values()) > 0
+
+
+class FullDiskStore:
+    def __init__(self):
+        self.fail = True
+        self.saved = []
+
+    def save_dict(self, data):
+        if self.fail:
+            raise OSError("No space left on device")
+        self.saved.append(data)
+
+
+def test_failed_writes_are_reported_and_retried(capsys):
+    store, player = FullDiskStore(), Player("Hero")
+    ui = ScriptedUI(["1", "1", "1"])
+    ui.autosaver = saver = Autosaver(store, lambda: player, interval=0.0)
+    shown = []
+    ui.line = lambda text="": shown.append(text)
+    ui.prompt("> ")
+    saver.writer.flush()
+    assert "No space left" in capsys.readouterr().err
+    store.fail = False
+    ui.prompt("> ")
+    assert any("Autosave failed" in text for text in shown)
+    saver.writer.flush()
+    ui.prompt("> ")
+    saver.close()
+    assert store.saved and saver.writer.errors == 1
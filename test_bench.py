@@ -0,0 +1,20 @@
+import json
+
+import bench
+
+
+def test_every_scenario_runs_at_small_scale():
+    for name in bench.SCENARIOS:
+        assert bench.run_scenario(name, scale=0.001, repeat=1) > 0
+
+
+def test_baseline_covers_every_scenario():
+    with open(bench.BASELINE_PATH) as f:
+        baseline = json.load(f)
+    memory = {f"memory_{name}" for name in bench.MEMORY_SCENARIOS}
+    assert set(baseline) == set(bench.SCENARIOS) | memory
+
+
+def test_memory_scenarios_report_bytes():
+    for name in bench.MEMORY_SCENARIOS:
+        assert bench.measure_memory(name, count=50) > 0
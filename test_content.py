@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+
+from content import CONTENT, ContentRegistry
+from engine import GameController
+from models import ITEMS, Player
+from replay import ScriptedUI
+from session import GameSession
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_items(directory, count, level=1):
+    rows = [{"name": f"Mod {i}", "price": 10 + i, "type": "attack_boost", "bonus": 1, "level": level}
+            for i in range(count)]
+    with open(os.path.join(directory, "items.json"), "w") as f:
+        json.dump(rows, f)
+
+
+def test_indexes():
+    assert [i.name for i in CONTENT.by_type["heal"]] == ["Health Potion", "Greater Health Potion"]
+    assert all(i.price <= 100 for i in CONTENT.affordable(100))
+    assert {i.name for i in CONTENT.affordable(100)} == {n for n, i in ITEMS.items() if i.price <= 100}
+    assert CONTENT.price_rank["Health Potion"] == 0
+    assert CONTENT.items["Shield"] is ITEMS["Shield"]
+
+
+def shop_writes(content) -> int:
+    gc = GameController()
+    gc.content = content
+    gc.player = Player("Hero")
+    gc.ui = ScriptedUI(["0"])
+    writes = []
+    gc.ui.write = writes.append
+    gc.ui.line = writes.append
+    gc.shop()
+    return len(writes)
+
+
+def test_shop_visit_costs_the_same_for_a_big_catalog(tmp_path):
+    write_items(tmp_path, 5000)
+    modded = ContentRegistry.load(str(tmp_path))
+    assert len(modded.items) == 5000 and modded.resources == CONTENT.resources
+    assert shop_writes(modded) == shop_writes(CONTENT)
+    assert modded.shop_table(1).options["5000"] == "Mod 4999"
+
+
+def test_level_bands(tmp_path):
+    write_items(tmp_path, 3, level=5)
+    modded = ContentRegistry.load(str(tmp_path))
+    assert modded.shop_table(1).names == ()
+    assert modded.shop_table(7).names == ("Mod 0", "Mod 1", "Mod 2")
+    gc = GameController()
+    gc.content = modded
+    gc.player = Player("Hero")
+    gc.player.coins = 1000
+    gc.ui = ScriptedUI([])
+    assert not gc.buy("Mod 0")
+
+
+def test_content_dir_override(tmp_path):
+    write_items(tmp_path, 3)
+    out = subprocess.run([sys.executable, "-c", "import models; print(len(models.ITEMS), len(models.RESOURCES))"],
+                         cwd=GAME_DIR, env={**os.environ, "RPG_CONTENT_DIR": str(tmp_path)},
+                         capture_output=True, text=True).stdout
+    assert out.split() == ["3", "8"]
+
+
+def test_registry_mining_uses_its_own_weights(tmp_path):
+    with open(tmp_path / "resources.json", "w") as f:
+        json.dump({"success_chance": 1.0, "resources": [{"name": "Stone", "price": 1, "weight": 0},
+                                                         {"name": "Gold", "price": 50, "weight": 1}]}, f)
+    gc = GameController()
+    gc.content = ContentRegistry.load(str(tmp_path))
+    gc.player = Player("Hero")
+    gc.ui = ScriptedUI([])
+    assert gc.mine(20) == {"Gold": 20}
+
+
+def test_modded_items_can_be_used(tmp_path):
+    with open(tmp_path / "items.json", "w") as f:
+        json.dump([{"name": "Rune Blade", "price": 40, "type": "attack_boost", "bonus": 9}], f)
+    gc = GameController()
+    gc.content = ContentRegistry.load(str(tmp_path))
+    gc.player = Player("Hero")
+    gc.player.coins = 1000
+    gc.ui = ScriptedUI(["1", "2", "1", "R", "y"])
+    gc.shop()
+    gc.use_item_menu()
+    assert gc.player.attack == 10 + 9 and gc.player.inventory.count("Rune Blade") == 1
+    gc.shop()
+    assert gc.player.attack > 19 and gc.player.inventory.count("Rune Blade") == 1
+
+    session = GameSession("Bot", seed=1)
+    session.reset()
+    session.gc.content = gc.content
+    session.player.coins = 100
+    obs, _, _ = session.step("buy 'rune blade'")
+    obs, _, _ = session.step("use 'rune blade'")
+    assert obs["error"] is None and obs["player"]["attack"] == 19
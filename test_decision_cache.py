@@ -0,0 +1,40 @@
+from decision_cache import DecisionCache, normalize
+from models import Colors, Player
+from ui import GameUI
+
+
+def _status_screen(health, coins):
+    player = Player("Hero")
+    player.health, player.coins = health, coins
+    ui = GameUI()
+    ui.print_status(player)
+    screen = "".join(ui._buffer)
+    return screen + "\n1. Explore the Wilds\n> "
+
+
+def test_similar_states_share_a_key():
+    cache = DecisionCache()
+    full = cache.key(_status_screen(100, 120))
+    assert cache.key(_status_screen(99, 180)) == full
+    assert cache.key(_status_screen(35, 120)) != full
+    assert "\033" not in normalize(f"{Colors.GREEN}HP 5/10{Colors.ENDC}")
+
+
+def test_lru_eviction_and_hit_rate():
+    cache = DecisionCache(capacity=2)
+    for name in "abc":
+        cache.put(name, {"thought": name, "action": "1"})
+    assert cache.get("a") is None
+    assert cache.get("c")["thought"] == "c"
+    assert len(cache) == 2 and cache.hit_rate == 0.5
+
+
+def test_persists_between_runs(tmp_path):
+    path = str(tmp_path / "decisions.db")
+    cache = DecisionCache(path=path)
+    cache.put(cache.key("> "), {"thought": "explore", "action": "1"})
+    cache.close()
+
+    again = DecisionCache(path=path)
+    assert again.get(again.key("> ")) == {"thought": "explore", "action": "1"}
+    again.close()
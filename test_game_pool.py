@@ -0,0 +1,80 @@
+import sys
+
+import pytest
+
+from game_pool import GamePool
+
+
+def test_workers_are_reused_across_games(tmp_path):
+    pool = GamePool(size=1, cwd=str(tmp_path))
+    try:
+        game = pool.acquire()
+        pid = game.worker.process.pid
+        assert game.read_output().endswith("Continue previous adventure? (y/n): ")
+        for reply in ["n", "Quitter", "normal", "5"]:
+            game.send_input(reply)
+            screen = game.read_output()
+        assert "Farewell, adventurer!" in screen
+        assert not game.is_running()
+        pool.release(game)
+
+        # An unfinished game is reset and the same process serves the next one.
+        game = pool.acquire()
+        assert game.worker.process.pid == pid
+        assert "Continue previous adventure?" in game.read_output()
+        game.send_input("n")
+        assert game.read_output().endswith("Character Name: ")
+        pool.release(game)
+
+        game = pool.acquire()
+        assert game.worker.process.pid == pid and game.worker.games == 3
+        assert "ENHANCED RPG EXPERIENCE" in game.read_output()
+        pool.release(game)
+        assert "(3 games)" in pool.report()
+    finally:
+        pool.close()
+
+
+def test_game_command_runs_without_a_shell():
+    pytest.importorskip("openai")
+    from small_llm_play_game import game_argv
+
+    assert game_argv("python main.py --plain") == [sys.executable, "main.py", "--plain"]
+    assert game_argv("./rpg 'two words'") == ["./rpg", "two words"]
+
+
+class ScriptedAI:
+    """Answers every screen with the next action and remembers what it saw."""
+
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.screens = []
+
+    def get_action(self, history, screen=None, previous=None):
+        self.screens.append(screen)
+        return {"thought": "", "action": self.actions.pop(0)}
+
+
+def test_play_runs_consecutive_pooled_games_in_step(tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    import small_llm_play_game
+    from observation import ObservationCompactor
+    from transcript import Transcript
+
+    monkeypatch.setattr(small_llm_play_game, "AI_SPEED", 0)
+    # Each game's last action answers the farewell screen and must go nowhere.
+    ai = ScriptedAI(["n", "First", "normal", "5", "n", "n", "Second", "easy", "5", "n"])
+    pool = GamePool(size=1, cwd=str(tmp_path))
+    seen = []
+    try:
+        for number in (1, 2):
+            game = pool.acquire()
+            small_llm_play_game.play(ai, game, ObservationCompactor(), Transcript(console="off"), game=number)
+            pool.release(game)
+            seen.append(ai.screens[-2])
+            ai.screens.clear()
+    finally:
+        pool.close()
+    assert "--- First ---" in seen[0]
+    assert "--- Second ---" in seen[1] and "150/150" in seen[1]
+    assert ai.actions == []
@@ -0,0 +1,49 @@
+import builtins
+
+import pytest
+
+from engine import GameController
+from models import Inventory, Player, RESOURCES
+
+
+def test_inventory_counts_and_list_view():
+    inv = Inventory(["Stone", "Coal", "Stone"])
+    inv.add("Stone", 1_000_000)
+    assert inv.count("Stone") == 1_000_002
+    assert len(inv) == 1_000_003
+    inv.remove("Stone", 1_000_002)
+    assert "Stone" not in inv
+    assert inv == ["Coal"]
+    with pytest.raises(ValueError):
+        inv.remove("Coal", 2)
+    inv.append("Iron Ore")
+    assert list(inv) == ["Coal", "Iron Ore"]
+
+
+def test_player_inventory_accepts_lists():
+    player = Player("TestPlayer")
+    player.inventory = ["Health Potion", "Health Potion"]
+    assert isinstance(player.inventory, Inventory)
+    assert player.inventory.count("Health Potion") == 2
+
+
+def test_sell_all_resources(monkeypatch):
+    gc = GameController()
+    gc.player = Player("TestPlayer")
+    gc.player.inventory.add("Stone", 1_000_000)
+    gc.player.inventory.add("Diamond", 2)
+    gc.player.inventory.add("Shield")
+    monkeypatch.setattr(builtins, "input", lambda prompt="": "A")
+    gc.sell_resources()
+    assert gc.player.coins == 1_000_000 * RESOURCES["Stone"] + 2 * RESOURCES["Diamond"]
+    assert gc.player.inventory == ["Shield"]
+
+
+def test_bulk_mining_adds_counts():
+    gc = GameController()
+    gc.player = Player("TestPlayer")
+    found = gc.mine(10_000)
+    assert set(found) <= set(RESOURCES)
+    assert sum(found.values()) == len(gc.player.inventory)
+    assert 6_500 < len(gc.player.inventory) < 7_500
+    assert found["Stone"] > found["Mithril"]
@@ -0,0 +1,54 @@
+import json
+import os
+import random
+import subprocess
+import sys
+
+import metrics
+from engine import GameController
+from models import Player
+from ui import NullUI
+
+
+def test_disabled_metrics_leave_methods_untouched():
+    original = GameController.attack
+    assert not metrics.enabled()
+    with metrics.timer("anything"):
+        pass
+    metrics.count("anything")
+    assert "anything" not in metrics.timings and "anything" not in metrics.counters
+    assert GameController.attack is original
+
+
+def test_instrumented_methods_are_timed_and_restored():
+    original = GameController.mine
+    metrics.reset()
+    metrics.enable()
+    metrics.instrument_game()
+    try:
+        gc = GameController(rng=random.Random(1))
+        gc.ui = NullUI()
+        gc.player = Player("Hero")
+        gc.mine(100)
+        gc.sell_all()
+        summary = metrics.summary()
+    finally:
+        metrics.disable()
+        metrics.reset()
+    assert summary["timers"]["game.mine"]["calls"] == 1
+    assert summary["timers"]["game.sell_all"]["calls"] == 1
+    assert summary["timers"]["inventory.add"]["calls"] >= 1
+    assert GameController.mine is original
+
+
+def test_profile_flag_writes_metrics(tmp_path):
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = tmp_path / "metrics.json"
+    result = subprocess.run(
+        [sys.executable, os.path.join(here, "main.py"), "--plain", "--seed", "5", "--profile", str(out)],
+        input="n\nProf\nnormal\n3\n500\n1\nu\n5\n", capture_output=True, text=True, cwd=tmp_path, timeout=60)
+    assert "function calls" in result.stderr
+    data = json.loads(out.read_text())
+    assert data["timers"]["game.mine"]["calls"] == 1
+    assert data["timers"]["game.battle"]["calls"] == 1
+    assert data["battles_per_sec"] > 0
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from engine import GameController
+from models import ITEMS, ENEMY_TEMPLATES, EnemyPool, Player, Enemy
+from ui import NullUI
+
+
+def test_items_are_shared_and_immutable():
+    with pytest.raises(AttributeError):
+        ITEMS["Shield"].bonus = 999
+    assert ITEMS["Shield"].bonus == 5
+
+
+def test_models_have_no_instance_dict():
+    for obj in (Player("Slim"), Enemy("Rat", 1, 1, 1, 1), Player("Slim").inventory):
+        assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+        Player("Slim").nickname = "typo"
+
+
+def test_create_enemy_scales_shared_templates():
+    gc = GameController(rng=random.Random(2))
+    gc.ui = NullUI()
+    gc.player = Player("Hero", "hardcore")
+    for _ in range(4):
+        gc.player.level_up()
+    enemy = gc.create_enemy()
+    template = next(t for t in ENEMY_TEMPLATES["hardcore"] if t.name == enemy.name)
+    assert (enemy.health, enemy.attack, enemy.defense, enemy.level) == (
+        template.health + 50, template.attack + 15, template.defense + 5, 5)
+
+
+def test_enemy_pool_reuses_released_slots():
+    pool = EnemyPool("normal")
+    slots = pool.spawn_many(3, 10, random.Random(0))
+    assert len(pool) == 10
+    pool.release(slots[4])
+    assert len(pool) == 9
+    assert pool.spawn(7, random.Random(1)) == slots[4]
+    enemy = pool.get(slots[4])
+    assert enemy.level == 7 and enemy.name in {t.name for t in ENEMY_TEMPLATES["normal"]}
+    assert len(pool.health) == 10
@@ -0,0 +1,73 @@
+import io
+
+from engine import GameController
+from models import Player
+from observation import ObservationCompactor, estimate_tokens
+from ui import GameUI
+
+
+def _main_screen(player):
+    ui = GameUI(stream=io.StringIO())
+    ui.print_status(player)
+    ui.line("\nWhat will you do?")
+    ui.line("1. Explore the Wilds")
+    ui.line("2. Visit the Shop")
+    ui.write("> ")
+    return "".join(ui._buffer)
+
+
+def test_compact_record_and_menu_deltas():
+    player = Player("Hero")
+    compactor = ObservationCompactor()
+    first = compactor.compact(_main_screen(player))
+    assert first == "hp 100/100 lvl 1 exp 0/100 coins 0 atk 10 def 5 | menu: 1 Explore the Wilds; 2 Visit the Shop | prompt: >"
+
+    player.health, player.coins = 80, 40
+    second = compactor.compact(_main_screen(player))
+    assert second == "hp 80/100(-20) lvl 1 exp 0/100 coins 40(+40) atk 10 def 5 | prompt: >"
+    assert "\033" not in first + second
+    assert compactor.tokens_saved > 0 and "saved" in compactor.report()
+
+
+def test_shop_table_sent_once():
+    gc = GameController()
+    gc.player = Player("Hero")
+    compactor = ObservationCompactor()
+    records = []
+    for _ in range(2):
+        gc.ui = GameUI(stream=io.StringIO())
+        gc.ui.prompt = lambda text, *args: gc.ui.write(text) or "0"
+        gc.shop()
+        records.append(compactor.compact("".join(gc.ui._buffer)))
+    assert "Godly Armor" in records[0] and "Godly Armor" not in records[1]
+    assert records[1] == "[VILLAGE SHOP] | prompt: Choice:"
+
+
+def test_trim_to_token_budget():
+    history = [{"role": "user", "content": "x" * 400} for _ in range(10)]
+    trimmed = ObservationCompactor().trim(history, 350)
+    assert len(trimmed) == 3
+    assert ObservationCompactor().trim(history[:1], 1) == history[:1]
+    assert estimate_tokens("x" * 400) == 100
+
+
+def test_trimmed_menu_is_sent_again():
+    player = Player("Hero")
+    compactor = ObservationCompactor()
+    history = [{"role": "user", "content": compactor.compact(_main_screen(player))}]
+    assert "menu:" in history[0]["content"]
+    history.append({"role": "user", "content": "x" * 400})
+    history = compactor.trim(history, 100)
+    assert len(history) == 1
+    assert "menu: 1 Explore the Wilds" in compactor.compact(_main_screen(player))
+    assert "menu:" not in compactor.compact(_main_screen(player))
+
+
+def test_reset_starts_a_new_game():
+    player = Player("Hero")
+    compactor = ObservationCompactor()
+    compactor.compact(_main_screen(player))
+    player.coins = 40
+    compactor.reset()
+    record = compactor.compact(_main_screen(player))
+    assert "coins 40 " in record and "(+40)" not in record and "menu:" in record
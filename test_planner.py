@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from content import CONTENT
+from engine import GameController
+from models import Player
+from planner import BoostKnapsack, _below, exact_win, plan
+from replay import ScriptedUI
+from session import GameSession
+
+
+def brute_force(items, coins, limits=None):
+    limits = limits or {}
+    best = [0] * (coins + 1)
+    for item in items:
+        if item.name in limits:
+            for _ in range(limits[item.name]):
+                for c in range(coins, item.price - 1, -1):
+                    best[c] = max(best[c], best[c - item.price] + item.bonus)
+        else:
+            for c in range(item.price, coins + 1):
+                best[c] = max(best[c], best[c - item.price] + item.bonus)
+    return best
+
+
+def test_knapsack_matches_brute_force():
+    for kind in ("attack_boost", "defense_boost"):
+        items = CONTENT.by_type[kind]
+        limits = {items[0].name: 3, items[-1].name: 1}
+        for lim in (None, limits):
+            knapsack = BoostKnapsack(items, lim)
+            expected = brute_force(items, 30000, lim)
+            for coins in range(0, 30001, 37):
+                bundle = knapsack.bundle(coins)
+                assert bundle.bonus == expected[coins] == knapsack.bonus(coins)[0]
+                assert bundle.cost <= coins
+                assert all(bundle.items.get(name, 0) <= qty for name, qty in (lim or {}).items())
+
+
+def test_millions_of_coins_answer_quickly():
+    player = Player("Rich")
+    player.coins = 7_654_321
+    plan(player, "attack")
+    start = time.perf_counter()
+    advice = plan(player, "attack")
+    assert time.perf_counter() - start < 0.05
+    best = max(CONTENT.by_type["attack_boost"], key=lambda i: i.bonus / i.price)
+    assert advice.cost <= player.coins
+    assert advice.attack >= player.coins // best.price * best.bonus
+
+
+def test_win_plan_answers_quickly_from_cold():
+    for mode, coins in (("normal", 2_500_000), ("hardcore", 100_000)):
+        player = Player("Rich", mode)
+        player.coins = coins
+        _below.cache_clear()
+        start = time.perf_counter()
+        advice = plan(player, "win")
+        assert time.perf_counter() - start < 0.05
+        assert advice.win > 0.999
+
+
+def test_win_plan_improves_odds_without_overspending():
+    player = Player("Hero")
+    player.coins = 1_000_000
+    advice = plan(player, "win")
+    assert advice.win > advice.win_before
+    assert advice.cost < player.coins // 100
+    enemies = [t.spawn(1) for t in CONTENT.enemy_templates("normal")]
+    assert exact_win(player.attack + advice.attack, player.defense + advice.defense,
+                     player.health, enemies) == pytest.approx(advice.win, abs=1e-6)
+
+
+def test_win_plan_never_gets_worse_with_more_coins():
+    player = Player("Hero", "hardcore")
+    enemies = [t.spawn(1) for t in CONTENT.enemy_templates("hardcore")]
+    last = 0.0
+    for coins in (200, 500, 2_000, 100_000, 1_000_000):
+        advice = plan(player, "win", coins)
+        win = exact_win(player.attack + advice.attack, player.defense + advice.defense, player.health, enemies)
+        assert win == pytest.approx(advice.win, abs=1e-6)
+        assert win >= last - 0.001
+        last = win
+    assert last > 0.999
+
+
+def test_shop_recommend_buys_and_uses_the_bundle():
+    gc = GameController()
+    gc.player = Player("Hero")
+    gc.player.coins = 500
+    gc.ui = ScriptedUI(["R", "y"])
+    gc.shop()
+    assert gc.player.attack + gc.player.defense > 15
+    assert gc.player.coins < 500 and not gc.player.inventory
+
+
+def test_session_recommend():
+    session = GameSession("Bot", seed=1)
+    session.reset()
+    session.player.coins = 300
+    obs, _, _ = session.step("recommend attack")
+    assert obs["error"] is None and obs["player"]["attack"] > 10
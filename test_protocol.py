@@ -0,0 +1,31 @@
+import io
+import json
+
+from engine import GameController
+from models import Player
+from protocol import JsonlUI, parse_reply
+
+
+def test_parse_reply_accepts_json_and_bare_lines():
+    assert parse_reply('{"input": "a"}\n') == "a"
+    assert parse_reply('"hello world"\n') == "hello world"
+    assert parse_reply("5\n") == "5"
+    assert parse_reply("Health Potion\n") == "Health Potion"
+
+
+def test_each_prompt_is_one_json_line():
+    gc = GameController()
+    gc.player = Player("Hero", "easy")
+    gc.player.inventory.add("Stone", 3)
+    out = io.StringIO()
+    gc.ui = JsonlUI(gc, stream=out, stdin=io.StringIO('{"input": "A"}\n'))
+    gc.sell_resources()
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 1
+    turn = json.loads(lines[0])
+    assert turn["type"] == "prompt" and turn["prompt_id"] == "sell_choice"
+    assert turn["options"]["1"] == "Stone"
+    assert turn["player"]["inventory"] == {"Stone": 3}
+    assert "SELL RESOURCES" in turn["screen"] and "\033" not in turn["screen"]
+    assert gc.player.coins == 6
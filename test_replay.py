@@ -0,0 +1,81 @@
+import json
+import random
+
+from engine import GameController
+from main import run_game
+from replay import Journal, JournalingStore, ScriptedUI, replay
+from saves import JsonSaveStore
+from session import GameSession
+
+INPUTS = ["n", "Hero", "normal", "3", "400", "2", "S", "A", "2", "1", "2", "1"] + ["a"] * 12 + ["5"]
+
+
+def _record(path, seed, tmp_path):
+    gc = GameController(JsonSaveStore(str(tmp_path)), random.Random(seed))
+    gc.ui = ScriptedUI(INPUTS)
+    journal = gc.ui.journal = Journal(str(path), seed)
+    gc.store = JournalingStore(gc.store, journal)
+    try:
+        run_game(gc)
+    except EOFError:
+        pass
+    journal.close(gc.player)
+    return gc.player
+
+
+def test_replay_reproduces_session(tmp_path):
+    path = tmp_path / "session.jsonl"
+    player = _record(path, 42, tmp_path)
+    result = replay(str(path))
+    assert result["matches"], result
+    assert result["final"]["coins"] == player.coins
+
+
+def test_replay_detects_divergence(tmp_path):
+    path = tmp_path / "session.jsonl"
+    _record(path, 42, tmp_path)
+    lines = path.read_text().splitlines()
+    start = json.loads(lines[0])
+    start["seed"] = 43
+    path.write_text("\n".join([json.dumps(start)] + lines[1:]) + "\n")
+    assert not replay(str(path))["matches"]
+
+
+def test_appended_journal_replays_every_session(tmp_path):
+    path = tmp_path / "session.jsonl"
+    _record(path, 42, tmp_path)
+    player = _record(path, 7, tmp_path)
+    result = replay(str(path))
+    assert result["matches"] and len(result["sessions"]) == 2
+    assert result["final"]["coins"] == player.coins
+
+    lines = path.read_text().splitlines()
+    second = max(i for i, line in enumerate(lines) if json.loads(line)["type"] == "start")
+    lines[second] = json.dumps({**json.loads(lines[second]), "seed": 8})
+    path.write_text("\n".join(lines) + "\n")
+    result = replay(str(path))
+    assert [s["matches"] for s in result["sessions"]] == [True, False]
+
+
+def test_seeded_sessions_are_deterministic():
+    runs = []
+    for _ in range(2):
+        session = GameSession("Agent", "normal", seed=7)
+        session.reset()
+        session.step("mine 100")
+        session.step("explore")
+        obs = None
+        for _ in range(5):
+            obs, _, done = session.step("attack")
+            if obs["phase"] != "battle":
+                break
+        runs.append(obs)
+    assert runs[0] == runs[1]
+
+
+def test_journal_records_reach_the_file_before_close(tmp_path):
+    path = tmp_path / "session.jsonl"
+    journal = Journal(str(path), 7)
+    journal.record_input("main_menu", "1")
+    assert [json.loads(line)["type"] for line in path.read_text().splitlines()] == ["start", "input"]
+    journal.close(None)
@@ -0,0 +1,65 @@
+import json
+
+from models import Player
+from saves import JsonSaveStore, SAVE_VERSION
+
+
+def test_round_trip_counts_inventory(tmp_path):
+    store = JsonSaveStore(str(tmp_path))
+    player = Player("Hero", "easy")
+    player.coins = 1234
+    player.inventory.add("Stone", 500_000)
+    player.inventory.add("Shield", 2)
+    store.save(player)
+
+    with open(store.path("Hero")) as f:
+        data = json.load(f)
+    assert data["version"] == SAVE_VERSION
+    assert data["inv"] == {"Stone": 500_000, "Shield": 2}
+    assert [p.name for p in tmp_path.iterdir()] == ["Hero_save.json"]
+
+    loaded = store.load("Hero")
+    assert loaded.game_mode == "easy" and loaded.coins == 1234
+    assert loaded.inventory == player.inventory
+    assert store.load("Nobody") is None
+
+
+def test_legacy_save_is_migrated(tmp_path):
+    store = JsonSaveStore(str(tmp_path))
+    legacy = {"name": "Old", "mode": "normal", "lvl": 3, "exp": 10, "coins": 5,
+              "inv": ["Stone", "Stone", "Coal"], "hp": 90, "atk": 20, "def": 11}
+    with open(store.path("Old"), "w") as f:
+        json.dump(legacy, f)
+
+    player = store.load("Old")
+    assert player.level == 3 and player.inventory.count("Stone") == 2
+
+    with open(store.path("Old")) as f:
+        migrated = json.load(f)
+    assert migrated["version"] == SAVE_VERSION
+    assert migrated["inv"] == {"Stone": 2, "Coal": 1}
+
+
+def test_sqlite_store_queries(tmp_path):
+    from saves import SqliteSaveStore
+
+    store = SqliteSaveStore(str(tmp_path / "saves.db"))
+    for i, name in enumerate(["Ann", "Bob", "Cid"]):
+        player = Player(name)
+        player.level, player.coins = i + 1, 100 * (3 - i)
+        player.inventory.add("Coal", i)
+        store.save(player)
+
+    assert [c["name"] for c in store.list_characters()] == ["Ann", "Bob", "Cid"]
+    assert [c["name"] for c in store.top("level", 2)] == ["Cid", "Bob"]
+    assert [c["name"] for c in store.top("coins", 1)] == ["Ann"]
+    assert store.last_played(1)[0]["name"] == "Cid"
+
+    # A second store (as another game process would open) sees the same rows.
+    other = SqliteSaveStore(str(tmp_path / "saves.db"))
+    player = other.load("Cid")
+    player.coins = 999
+    other.save(player)
+    assert store.load("Cid").coins == 999
+    assert store.load("Cid").inventory.count("Coal") == 2
+    assert store.load("Nobody") is None
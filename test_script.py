@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+from saves import JsonSaveStore
+from script import expand, run_script, split_commands
+from session import GameSession
+
+
+def test_split_commands_respects_quotes_and_comments():
+    text = 'mine 5; buy "Odd; Name" 2  # trailing comment\n\n# a comment line\n3x sell all'
+    assert split_commands(text) == [(1, "mine 5"), (1, 'buy "Odd; Name" 2'), (4, "3x sell all")]
+    assert expand(split_commands("2x mine; save")) == [(1, "mine"), (1, "mine"), (1, "save")]
+
+
+def test_run_script_reports_changes_and_errors(tmp_path):
+    session = GameSession("Miner", store=JsonSaveStore(str(tmp_path)), seed=4)
+    session.resume()
+    result = run_script(session, '200x mine 10; sell all; buy "health potion" 3; dance; save')
+    assert result["executed"] == result["commands"] == 204
+    assert result["after"]["inventory"] == {"Health Potion": 3}
+    assert result["after"]["coins"] > 0 and result["before"]["coins"] == 0
+    assert result["errors"] == [(1, "dance", "unknown action 'dance'")]
+
+    # The next script picks the saved character up again.
+    again = GameSession("Miner", store=JsonSaveStore(str(tmp_path)), seed=5)
+    again.resume()
+    assert again.player.coins == result["after"]["coins"]
+
+
+def test_exec_flag_prints_one_summary(tmp_path):
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, os.path.join(here, "main.py"), "--plain", "--seed", "1",
+                          "--name", "Cli", "--exec", "mine 50; sell all; save"],
+                         capture_output=True, text=True, cwd=tmp_path, timeout=60).stdout
+    assert out.count("SCRIPT SUMMARY") == 1
+    assert "Ran 3/3 commands" in out and "What will you do?" not in out
+    assert (tmp_path / "Cli_save.json").exists()
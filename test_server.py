@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from saves import JsonSaveStore
+from server import GameServer, client_script, play_client
+
+
+async def _serve(server):
+    tcp = await server.serve("127.0.0.1", 0)
+    return tcp, tcp.sockets[0].getsockname()[1]
+
+
+def test_many_concurrent_sessions(tmp_path):
+    async def run():
+        server = GameServer(JsonSaveStore(str(tmp_path)), seed=1)
+        tcp, port = await _serve(server)
+        results = await asyncio.gather(*(play_client("127.0.0.1", port, client_script(i, 6)) for i in range(20)))
+        tcp.close()
+        await tcp.wait_closed()
+        return server, results
+
+    server, results = asyncio.run(run())
+    script_len = len(client_script(0, 6))
+    assert all(len(latencies) == script_len for latencies in results)
+    assert server.stats["connections"] == 20 and not server.sessions
+
+
+def test_idle_session_is_saved_and_closed(tmp_path):
+    async def run():
+        store = JsonSaveStore(str(tmp_path))
+        server = GameServer(store, idle_timeout=0.3, seed=1)
+        tcp, port = await _serve(server)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for reply in ["n", "Sleepy", "easy"]:
+            writer.write(reply.encode() + b"\r\n")
+        await writer.drain()
+        output = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        tcp.close()
+        await tcp.wait_closed()
+        return server, store, output
+
+    server, store, output = asyncio.run(run())
+    assert b"progress was saved" in output
+    assert server.stats["evicted"] == 1
+    assert store.load("Sleepy").game_mode == "easy"
+
+
+def test_full_server_refuses_connections(tmp_path):
+    async def run():
+        server = GameServer(JsonSaveStore(str(tmp_path)), max_sessions=0)
+        tcp, port = await _serve(server)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        output = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        tcp.close()
+        await tcp.wait_closed()
+        return server, output
+
+    server, output = asyncio.run(run())
+    assert b"Server full" in output and server.stats["refused"] == 1
+
+
+class BrokenStore(JsonSaveStore):
+    def load(self, name):
+        raise RuntimeError("disk on fire")
+
+
+def test_crashed_session_is_closed_and_forgotten(tmp_path, capsys):
+    async def run():
+        server = GameServer(BrokenStore(str(tmp_path)), seed=1)
+        tcp, port = await _serve(server)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"y\r\nHero\r\n")
+        await writer.drain()
+        output = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        tcp.close()
+        await tcp.wait_closed()
+        return server, output
+
+    server, output = asyncio.run(run())
+    assert b"internal error" in output
+    assert server.stats["crashed"] == 1 and not server.sessions
+    assert "disk on fire" in capsys.readouterr().err
+
+
+def test_names_cannot_leave_the_save_directory(tmp_path):
+    saves = tmp_path / "saves"
+    saves.mkdir()
+
+    async def run():
+        server = GameServer(JsonSaveStore(str(saves)), seed=1)
+        tcp, port = await _serve(server)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for reply in ["y", "../pwn", "../../pwn", "Safe-Name", "easy", "4", "5"]:
+            writer.write(reply.encode() + b"\r\n")
+        await writer.drain()
+        output = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        tcp.close()
+        await tcp.wait_closed()
+        return server, output
+
+    server, output = asyncio.run(run())
+    assert b"Names are up to 32" in output and server.stats["crashed"] == 0
+    assert sorted(p.name for p in tmp_path.rglob("*_save.json")) == ["Safe-Name_save.json"]
+    with pytest.raises(ValueError):
+        JsonSaveStore(str(saves)).path("../pwn")
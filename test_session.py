@@ -0,0 +1,53 @@
+from session import GameSession, VectorSession, parse_action
+
+
+def test_parse_action():
+    assert parse_action('buy "Health Potion" 3') == ("buy", "Health Potion", 3)
+    assert parse_action("buy health potion") == ("buy", "health potion", 1)
+    assert parse_action("mine 500") == ("mine", None, 500)
+    assert parse_action("sell all") == ("sell", "all", 1)
+
+
+def test_session_plays_without_io(capsys):
+    session = GameSession("Agent", "easy")
+    obs = session.reset()
+    assert obs["phase"] == "menu" and obs["player"]["health"] == 150
+
+    obs, reward, done = session.step("mine 2000")
+    assert sum(obs["player"]["inventory"].values()) > 1000
+    obs, _, _ = session.step("sell all")
+    assert obs["player"]["coins"] > 0 and obs["player"]["inventory"] == {}
+    obs, _, _ = session.step("buy health potion 2")
+    assert obs["player"]["inventory"] == {"Health Potion": 2}
+
+    obs, _, _ = session.step("explore")
+    assert obs["phase"] == "battle" and obs["enemy"]["name"] in ("Slime", "Bat")
+    while obs["phase"] == "battle":
+        obs, reward, done = session.step("attack")
+    assert reward == 1.0 and not done
+    assert obs["player"]["experience"] == 50
+
+    obs, _, _ = session.step("dance")
+    assert obs["error"]
+    _, _, done = session.step("quit")
+    assert done
+    assert capsys.readouterr().out == ""
+
+
+def test_vector_session_autoresets():
+    envs = VectorSession(50, mode="hardcore")
+    envs.reset()
+    envs.step(["explore"] * 50)
+    total = [0.0] * 50
+    finished = [False] * 50
+    for _ in range(20):
+        actions = ["explore" if f else "attack" for f in finished]
+        obs, rewards, dones = envs.step(actions)
+        for i, (r, d) in enumerate(zip(rewards, dones)):
+            if not finished[i]:
+                total[i] += r
+                finished[i] = d
+                if d:
+                    assert obs[i]["phase"] == "menu" and obs[i]["turn"] == 0
+    # Level 1 hardcore characters cannot beat a Demon Lord or Death Knight.
+    assert all(finished) and total == [-1.0] * 50
@@ -0,0 +1,30 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from sim import simulate, sweep, player_stats, WIN, LOSS, FLED
+
+
+def test_player_stats_follow_level_up():
+    assert player_stats("normal", 1) == (100, 10, 5)
+    assert player_stats("easy", 3) == (200, 25, 14)
+
+
+def test_simulate_is_reproducible_and_consistent():
+    a = simulate("normal", 5, n=2000, rng=np.random.default_rng(7))
+    b = simulate("normal", 5, n=2000, rng=np.random.default_rng(7))
+    assert (a.outcome == b.outcome).all()
+    assert set(np.unique(a.outcome)) <= {WIN, LOSS}
+    assert (a.turns >= 1).all()
+    assert (a.hp_left[a.outcome == LOSS] == 0).all()
+    assert (a.hp_left[a.outcome == WIN] > 0).all()
+
+
+def test_easy_beats_hardcore_and_flee_policy():
+    reports = sweep(("easy", "hardcore"), [1], n=5000, seed=1)
+    assert reports[("easy", 1)].win_rate > 0.99
+    assert reports[("hardcore", 1)].win_rate < 0.01
+
+    fleeing = simulate("hardcore", 1, n=5000, flee_below=1.1, rng=np.random.default_rng(3))
+    assert (fleeing.outcome == FLED).all()
+    assert 0.65 < np.mean(fleeing.turns == 1) < 0.75
@@ -0,0 +1,53 @@
+import random
+import sys
+
+import pytest
+
+from engine import GameController
+from models import Player, Enemy
+from solver import BattleSolver, solve
+from ui import NullUI
+
+
+def test_matches_monte_carlo():
+    gc = GameController(rng=random.Random(7))
+    gc.ui = NullUI()
+    gc.player = Player("Hero")
+    template = ("Goblin", 40, 18, 5, 1)
+    odds = solve(gc.player, Enemy(*template))
+
+    n, wins, turns = 20000, 0, 0
+    for _ in range(n):
+        gc.player.health = gc.player.max_health
+        enemy = Enemy(*template)
+        while enemy.health > 0 and gc.player.health > 0:
+            gc.attack(enemy)
+            turns += 1
+        wins += enemy.health <= 0
+    assert abs(wins / n - odds.win) < 0.015
+    assert abs(turns / n - odds.turns) < 0.1
+
+
+def test_terminal_and_certain_outcomes():
+    solver = BattleSolver(50, 100, 1, 0)
+    assert solver.odds(10, 1) == pytest.approx((1.0, 1.0, 0.0))
+    assert solver.odds(0, 10).win == 0.0
+    # A 1 HP player facing an enemy that survives the first hit always loses.
+    assert BattleSolver(1, 0, 20, 100).odds(1, 50).win == 0.0
+
+
+def test_long_fights_do_not_recurse():
+    # One point of damage per round: about 1400 nested states, past the recursion limit.
+    solver = BattleSolver(0, 100, 0, 100)
+    odds = solver.odds(2000, 700)
+    assert odds.win == pytest.approx(1.0)
+    assert 2 * odds.turns > sys.getrecursionlimit()
+
+
+def test_auto_resolve_finishes_the_fight_quietly():
+    gc = GameController(rng=random.Random(3))
+    gc.ui = NullUI()
+    gc.player = Player("Hero", "easy")
+    enemy = Enemy("Slime", 30, 5, 1, 1)
+    rounds = gc.auto_resolve(enemy)
+    assert rounds >= 1 and (enemy.health <= 0 or gc.player.health <= 0)
@@ -0,0 +1,44 @@
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from transcript import Transcript
+
+
+def test_records_rotate_and_compress(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    transcript = Transcript(path, max_bytes=2000, backups=2, console="off")
+    for i in range(60):
+        transcript.step("screen " * 20, "thinking", f"action {i}", 0.0123, game=1)
+    transcript.close()
+
+    assert transcript.rotations >= 3
+    assert sorted(os.listdir(tmp_path)) == ["run.jsonl", "run.jsonl.1.gz", "run.jsonl.2.gz"]
+    with gzip.open(path + ".1.gz", "rt") as f:
+        archived = [json.loads(line) for line in f]
+    with open(path) as f:
+        current = [json.loads(line) for line in f]
+    assert archived[-1]["step"] + 1 == current[0]["step"]
+    assert current[-1] == {**current[-1], "step": 60, "game": 1, "action": "action 59", "latency_ms": 12.3}
+
+
+def test_console_modes():
+    full = io.StringIO()
+    Transcript(console="full", stream=full).step("HP 10", "attack it", "attack", 0.5)
+    assert "HP 10" in full.getvalue() and ">>> AI chooses: attack" in full.getvalue()
+
+    throttled = io.StringIO()
+    transcript = Transcript(console="throttled", interval=3600, stream=throttled)
+    for _ in range(50):
+        transcript.step("HP 10", "attack it", "attack", 0.5, game=2)
+    assert throttled.getvalue().count("\n") == 1
+
+    quiet = io.StringIO()
+    Transcript(console="off", stream=quiet).step("HP 10", "", "attack", 0.5)
+    assert quiet.getvalue() == ""
+
+    with pytest.raises(ValueError):
+        Transcript(console="loud")
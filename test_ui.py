@@ -0,0 +1,43 @@
+import io
+import os
+import subprocess
+import sys
+
+from models import Colors, Player
+from ui import GameUI
+
+
+class CountingStream(io.StringIO):
+    writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+def test_screen_is_written_once():
+    stream = CountingStream()
+    ui = GameUI(stream=stream)
+    ui.print_status(Player("Hero"))
+    ui.print_header("shop")
+    ui.print_table_row(["#", "Item Name", "Price"], [4, 25, 8])
+    assert stream.writes == 0
+    ui.flush()
+    assert stream.writes == 1
+    assert "#    | Item Name                 | Price   \n" in stream.getvalue()
+
+
+def test_plain_ui_leaves_other_uis_colored():
+    plain, colored = GameUI(stream=io.StringIO(), plain=True), GameUI(stream=io.StringIO())
+    for ui in (plain, colored):
+        ui.print_status(Player("Hero"))
+        ui.flush()
+    assert "\033" not in plain.stream.getvalue()
+    assert Colors.GREEN in colored.stream.getvalue()
+
+
+def test_plain_mode_has_no_escape_codes():
+    out = subprocess.run([sys.executable, "main.py", "--plain"], input="n\nHero\nnormal\n5\n",
+                         capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    assert "Farewell, adventurer!" in out
+    assert "\033" not in out
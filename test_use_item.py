@@ -1,4 +1,5 @@
 from main import Player
+from models import ITEMS
 
 def test_use_item():
     # Create a player
@@ -18,10 +19,11 @@ def test_use_item():
     player.use_item("Strength Potion")
     assert player.attack == initial_attack + 5, f"Expected {initial_attack + 5}, got {player.attack}"
     
-    # Test using an iron sword
+    # Test using an iron sword (its bonus comes from the item data)
     initial_attack = player.attack
     player.use_item("Iron Sword")
-    assert player.attack == initial_attack + 10, f"Expected {initial_attack + 10}, got {player.attack}"
+    expected_attack = initial_attack + ITEMS["Iron Sword"].bonus
+    assert player.attack == expected_attack, f"Expected {expected_attack}, got {player.attack}"
     
     # Test using a shield
     initial_defense = player.defense
@@ -0,0 +1,104 @@
+"""Structured, size-rotated logs of agent games.
+
+A Transcript takes one record per step (the screen the agent saw, its thought,
+its action and how long the model took) and appends it as a JSON line. Records
+are buffered and written with one write per turn, and once the file passes
+`max_bytes` it is gzipped to `<path>.1.gz` (older archives move up to
+`<path>.<backups>.gz`, the oldest is dropped) and a new file is started.
+
+The console can mirror the game as it is played:
+
+    full       every screen, thought and action, one write per turn
+    throttled  a one-line progress report at most every `interval` seconds
+    off        nothing, for headless fleet runs
+
+    transcript = Transcript("transcripts/agent.jsonl", console="throttled")
+    transcript.step(screen, thought, action, latency, game=3)
+    transcript.close()
+"""
+import gzip
+import json
+import os
+import shutil
+import sys
+import time
+from typing import List, Optional
+
+CONSOLE_MODES = ("full", "throttled", "off")
+
+
+class Transcript:
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 console: str = "full", interval: float = 2.0, stream=None):
+        if console not in CONSOLE_MODES:
+            raise ValueError(f"console must be one of {', '.join(CONSOLE_MODES)}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.console = console
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self.steps = 0
+        self.rotations = 0
+        self._pending: List[str] = []
+        self._last_report: Optional[float] = None
+        self._reported_steps = 0
+        self._file = None
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+            self._size = self._file.tell()
+
+    def step(self, observation: str, thought: str, action: str, latency: float, **extra):
+        """Records one turn and flushes it (and the console mirror) in one go."""
+        self.steps += 1
+        if self._file is not None:
+            record = {"t": round(time.time(), 3), "step": self.steps, **extra, "observation": observation,
+                      "thought": thought, "action": action, "latency_ms": round(latency * 1000, 1)}
+            self._pending.append(json.dumps(record, ensure_ascii=False) + "\n")
+        if self.console == "full":
+            self.stream.write(f"{observation}\n\U0001F914 AI THOUGHT: {thought}\n>>> AI chooses: {action}\n\n")
+            self.stream.flush()
+        elif self.console == "throttled":
+            now = time.monotonic()
+            if self._last_report is None or now - self._last_report >= self.interval:
+                label = "".join(f"{k} {v}, " for k, v in extra.items())
+                done = self.steps - self._reported_steps
+                self.stream.write(f"[{label}step {self.steps}] {action!r} in {latency * 1000:.0f} ms "
+                                  f"({done} steps since last report)\n")
+                self.stream.flush()
+                self._last_report, self._reported_steps = now, self.steps
+        self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        self._file.write(text)
+        self._file.flush()
+        self._size += len(text.encode("utf-8"))
+        if self._size >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self):
+        """Compresses the current file to <path>.1.gz and starts an empty one."""
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}.gz"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}.gz")
+        if self.backups > 0:
+            with open(self.path, "rb") as src, gzip.open(f"{self.path}.1.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+        self.rotations += 1
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
@@ -1,23 +1,86 @@
-import os
+import re
+import sys
 from models import Colors, Player
 
+CLEAR_SCREEN = "\033[2J\033[H"
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+def strip_ansi(text: str) -> str:
+    return ANSI_ESCAPE.sub("", text)
+
 class GameUI:
-    @staticmethod
-    def clear():
-        os.system('cls' if os.name == 'nt' else 'clear')
+    """Composes each screen into a buffer and writes it out in one go.
 
-    @staticmethod
-    def print_header(text: str):
-        print(f"\n{Colors.HEADER}{'='*20} {text.upper()} {'='*20}{Colors.ENDC}")
+    Nothing reaches the terminal until flush(), which prompt() calls right
+    before waiting for input, so a whole screen (status, tables, menu and
+    prompt) goes out as a single write. A plain UI strips the color codes
+    from its own output, leaving every other UI in the process colored.
+    """
 
-    @staticmethod
-    def print_status(player: Player):
-        print(f"\n{Colors.CYAN}{Colors.BOLD}--- {player.name} ---{Colors.ENDC}")
+    def __init__(self, stream=None, plain: bool = False):
+        self.stream = stream or sys.stdout
+        self.plain = plain
+        self._buffer = []
+        self.journal = None
+        self.autosaver = None
+
+    def write(self, text: str):
+        self._buffer.append(text)
+
+    def line(self, text: str = ""):
+        self._buffer.append(text)
+        self._buffer.append("\n")
+
+    def take(self) -> str:
+        """Empties the buffer and returns its text, without color codes if plain."""
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        return strip_ansi(text) if self.plain else text
+
+    def flush(self):
+        if self._buffer:
+            self.stream.write(self.take())
+            self.stream.flush()
+
+    def prompt(self, text: str, prompt_id: str = None, options: dict = None) -> str:
+        """Show `text` and return the reply.
+
+        `prompt_id` names the question and `options` maps valid replies to
+        their labels; the text UI ignores both but structured front ends
+        (see protocol.py) pass them on. Every reply is recorded in the
+        session journal, if there is one (see replay.py). Waiting for input
+        is also when the autosaver, if any, gets to snapshot the character
+        and reports a write that failed since the last prompt.
+        """
+        if self.autosaver is not None:
+            self.autosaver.checkpoint()
+            error = self.autosaver.take_error()
+            if error is not None:
+                self.line(f"{Colors.FAIL}Autosave failed ({error}); save manually to keep your progress.{Colors.ENDC}")
+        reply = self.ask(text, prompt_id, options)
+        if self.journal is not None:
+            self.journal.record_input(prompt_id, reply)
+        return reply
+
+    def ask(self, text: str, prompt_id: str = None, options: dict = None) -> str:
+        self.write(text)
+        self.flush()
+        return input()
+
+    def clear(self):
+        if not self.plain:
+            self.write(CLEAR_SCREEN)
+
+    def print_header(self, text: str):
+        self.line(f"\n{Colors.HEADER}{'='*20} {text.upper()} {'='*20}{Colors.ENDC}")
+
+    def print_status(self, player: Player):
         health_bar = GameUI.get_health_bar(player.health, player.max_health)
-        print(f"{Colors.GREEN}HP:    [{health_bar}] {player.health}/{player.max_health}{Colors.ENDC}")
-        print(f"{Colors.WARNING}Level: {player.level:<3} | EXP: {player.experience}/{player.level*100}{Colors.ENDC}")
-        print(f"{Colors.BLUE}Coins: {player.coins}{Colors.ENDC}")
-        print(f"{Colors.CYAN}ATK:   {player.attack:<3} | DEF: {player.defense}{Colors.ENDC}")
+        self.line(f"\n{Colors.CYAN}{Colors.BOLD}--- {player.name} ---{Colors.ENDC}")
+        self.line(f"{Colors.GREEN}HP:    [{health_bar}] {player.health}/{player.max_health}{Colors.ENDC}")
+        self.line(f"{Colors.WARNING}Level: {player.level:<3} | EXP: {player.experience}/{player.level*100}{Colors.ENDC}")
+        self.line(f"{Colors.BLUE}Coins: {player.coins}{Colors.ENDC}")
+        self.line(f"{Colors.CYAN}ATK:   {player.attack:<3} | DEF: {player.defense}{Colors.ENDC}")
 
     @staticmethod
     def get_health_bar(current, max_val, length=20):
@@ -26,8 +89,26 @@ class GameUI:
         return "#" * filled + "-" * (length - filled)
 
     @staticmethod
-    def print_table_row(cols: list, widths: list):
-        row = "" 
-        for col, width in zip(cols, widths):
-            row += f"{str(col):<{width}} | "
-        print(row[:-3])
\ No newline at end of file
+    def format_table_row(cols: list, widths: list) -> str:
+        return " | ".join(f"{str(col):<{width}}" for col, width in zip(cols, widths))
+
+    def print_table_row(self, cols: list, widths: list):
+        self.line(GameUI.format_table_row(cols, widths))
+
+class NullUI(GameUI):
+    """Discards all output; for headless sessions that never prompt."""
+
+    def __init__(self):
+        super().__init__(stream=None)
+
+    def write(self, text: str):
+        pass
+
+    def line(self, text: str = ""):
+        pass
+
+    def flush(self):
+        pass
+
+    def ask(self, text: str, prompt_id: str = None, options: dict = None) -> str:
+        raise RuntimeError(f"Headless session reached an interactive prompt: {text!r}")